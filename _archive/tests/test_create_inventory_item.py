@@ -4,7 +4,6 @@ Test script for the create_or_replace_inventory_item MCP tool
 """
 import json
 import requests
-import time
 
 # Test data for creating an inventory item (minimal test)
 test_inventory_item = {
@@ -15,8 +14,12 @@ test_inventory_item = {
     "quantity": 1
 }
 
-def test_create_inventory_item():
+def test_create_inventory_item(session=None):
     """Test creating an inventory item via the MCP Test UI API"""
+    if session is None:
+        # Called without a shared session (e.g. collected by pytest), so use a short-lived one
+        with requests.Session() as session:
+            return test_create_inventory_item(session)
 
     # MCP Test UI endpoint - note the tool name includes the server prefix
     url = "http://127.0.0.1:8000/mcp/execute/inventoryAPI_create_or_replace_inventory_item"
@@ -28,7 +31,7 @@ def test_create_inventory_item():
     
     try:
         # Make the request
-        response = requests.post(url, json=test_inventory_item, timeout=30)
+        response = session.post(url, json=test_inventory_item, timeout=30)
         
         print(f"Response Status Code: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
@@ -66,14 +69,19 @@ def test_create_inventory_item():
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
 
-def test_update_inventory_item():
+def test_update_inventory_item(session=None):
     """Test updating the same inventory item (should get 204 status)"""
+    if session is None:
+        # Called without a shared session (e.g. collected by pytest), so use a short-lived one
+        with requests.Session() as session:
+            return test_update_inventory_item(session)
     
     # Modify some fields for the update test
-    update_data = test_inventory_item.copy()
-    update_data["quantity"] = 10
-    update_data["product_description"] = "Updated description: High-quality wireless Bluetooth headphones with enhanced noise cancellation."
-    update_data["condition_description"] = "Brand new in original packaging - Updated"
+    update_data = test_inventory_item | {
+        "quantity": 10,
+        "product_description": "Updated description: High-quality wireless Bluetooth headphones with enhanced noise cancellation.",
+        "condition_description": "Brand new in original packaging - Updated",
+    }
     
     url = "http://127.0.0.1:8000/mcp/execute/inventoryAPI_create_or_replace_inventory_item"
     
@@ -84,7 +92,7 @@ def test_update_inventory_item():
     print("-" * 60)
     
     try:
-        response = requests.post(url, json=update_data, timeout=30)
+        response = session.post(url, json=update_data, timeout=30)
         
         print(f"Response Status Code: {response.status_code}")
         print("-" * 60)
@@ -122,14 +130,13 @@ if __name__ == "__main__":
     print("🧪 Testing create_or_replace_inventory_item MCP Tool")
     print("=" * 60)
     
-    # Test creating a new inventory item
-    test_create_inventory_item()
-    
-    # Wait a bit between tests
-    time.sleep(2)
-    
-    # Test updating the same inventory item
-    test_update_inventory_item()
+    # Reuse one keep-alive connection for both requests
+    with requests.Session() as session:
+        # Test creating a new inventory item
+        test_create_inventory_item(session)
+        
+        # Test updating the same inventory item (the create has already completed)
+        test_update_inventory_item(session)
     
     print("\n" + "=" * 60)
     print("🏁 Test completed!")
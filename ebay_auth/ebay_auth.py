@@ -9,6 +9,7 @@ import threading
 import http.server
 import socketserver
 import queue
+import time
 from urllib.parse import urlparse, parse_qs, urlencode
 import uuid # For state parameter
 
@@ -63,6 +64,20 @@ def get_env_variable(var_name, default=None):
         return default
     return value
 
+def _access_token_expiry(token_data):
+    """Converts the 'expires_in' of a token response into an absolute expiry time (seconds since the epoch).
+
+    Returns an empty string when the expiry is unknown, so saving it clears any expiry left over from a previous token.
+    """
+    expires_in = token_data.get("expires_in")
+    if not expires_in:
+        return ""
+    try:
+        return str(int(time.time()) + int(expires_in))
+    except (TypeError, ValueError):
+        logging.warning(f"Unexpected 'expires_in' value in token response: {expires_in}")
+        return ""
+
 def _save_to_env(key_values):
     """Saves or updates multiple key-value pairs in the .env file."""
     if not DOTENV_PATH:
@@ -222,7 +237,7 @@ def _exchange_auth_code_and_get_user_details(auth_code):
         
         access_token = token_data.get("access_token")
         refresh_token = token_data.get("refresh_token") # eBay usually provides this
-        # expires_in = token_data.get("expires_in") # Can be used to proactively refresh
+        expires_at = _access_token_expiry(token_data) # Used by the MCP server to refresh proactively
 
         if not access_token:
             logging.error("Access token not found in eBay response during code exchange.")
@@ -242,6 +257,7 @@ def _exchange_auth_code_and_get_user_details(auth_code):
             logging.info(f"Successfully fetched tokens and user details: UserID={user_id}, UserName={user_name}, AccessToken={access_token[:10]}..., RefreshToken={(refresh_token[:10] + '...') if refresh_token else 'N/A'}")
             env_vars_to_save = {
                 "EBAY_USER_ACCESS_TOKEN": access_token,
+                "EBAY_USER_ACCESS_TOKEN_EXPIRES_AT": expires_at,
                 "EBAY_USER_ID": user_id,
                 "EBAY_USER_NAME": user_name
             }
@@ -255,7 +271,7 @@ def _exchange_auth_code_and_get_user_details(auth_code):
                 # Decide if we should return None here if saving fails critically
         elif access_token: # We got tokens but not user details
             logging.warning(f"Obtained tokens (AccessToken={access_token[:10]}...) but failed to fetch user details. Saving tokens only.")
-            env_vars_to_save = {"EBAY_USER_ACCESS_TOKEN": access_token}
+            env_vars_to_save = {"EBAY_USER_ACCESS_TOKEN": access_token, "EBAY_USER_ACCESS_TOKEN_EXPIRES_AT": expires_at}
             if refresh_token:
                 env_vars_to_save["EBAY_USER_REFRESH_TOKEN"] = refresh_token
             _save_to_env(env_vars_to_save) # Attempt to save tokens anyway
@@ -426,7 +442,10 @@ def refresh_access_token(client_id=None, client_secret=None, refresh_token_val=N
         
         new_refresh_token = token_data.get("refresh_token")
         
-        env_vars_to_save = {"EBAY_USER_ACCESS_TOKEN": new_access_token}
+        env_vars_to_save = {
+            "EBAY_USER_ACCESS_TOKEN": new_access_token,
+            "EBAY_USER_ACCESS_TOKEN_EXPIRES_AT": _access_token_expiry(token_data),
+        }
         if new_refresh_token and new_refresh_token != current_refresh_token:
             logging.info(f"New refresh token received and saved: {new_refresh_token[:10]}...")
             env_vars_to_save["EBAY_USER_REFRESH_TOKEN"] = new_refresh_token
@@ -12,7 +12,8 @@ from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import auth-related models and functions
 from models.auth import LoginResult
@@ -20,7 +21,7 @@ from models.mcp_tools import TestAuthResponse, TriggerEbayLoginResponse
 from ebay_auth.ebay_auth import refresh_access_token as ebay_auth_refresh_token
 from ebay_auth.ebay_auth import initiate_user_login
 from ebay_service import get_ebay_access_token
-from utils.api_utils import execute_ebay_api_call, is_token_error
+from utils.api_utils import execute_ebay_api_call, is_token_error, invalidate_cached_token
 from utils.debug_httpx import create_debug_client
 
 # Load environment variables
@@ -35,23 +36,6 @@ logger = logging.getLogger(__name__)
 # Create Auth MCP server
 auth_mcp = FastMCP("eBay Auth API")
 
-# Helper to check if token is an error message
-def is_token_error(token: str) -> bool:
-    """Checks if the token string is actually an error message from get_ebay_access_token."""
-    if not token:  # Handles empty string or None
-        logger.warning("is_token_error received an empty or None token.")
-        return True  # Treat as error
-    # Common prefixes for error messages returned by get_ebay_access_token
-    error_prefixes = [
-        "Failed to get access token", 
-        "EBAY_CLIENT_ID or EBAY_CLIENT_SECRET is not set",
-        "No access_token found in eBay response",
-        "HTTPX RequestError occurred",
-        "An unexpected error occurred",
-        "EBAY_USER_ACCESS_TOKEN not found"  # Added from ebay_service update
-    ]
-    return any(token.startswith(prefix) for prefix in error_prefixes)
-
 @auth_mcp.tool()
 async def test_auth() -> str:
     """Test authentication and token retrieval"""
@@ -61,17 +45,17 @@ async def test_auth() -> str:
         token = await get_ebay_access_token()
         
         if is_token_error(token):
-            logger.error(f"test_auth: Token acquisition failed: {token}")
+            logger.error("test_auth: Token acquisition failed: %s", token)
             # Create and return an error response using the Pydantic model
             response = TestAuthResponse.error_response(token)
             return response.data
         
-        logger.info(f"test_auth: Token successfully retrieved. Length: {len(token)}")
+        logger.info("test_auth: Token successfully retrieved. Length: %s", len(token))
         # Create and return a success response using the Pydantic model
         response = TestAuthResponse.success_response(token)
         return response.data
     except Exception as e:
-        logger.exception(f"test_auth: Unexpected error during token retrieval: {str(e)}")
+        logger.exception("test_auth: Unexpected error during token retrieval: %s", e)
         # Handle unexpected errors
         response = TestAuthResponse.error_response(f"Unexpected error during token retrieval: {str(e)}")
         return response.data
@@ -87,13 +71,14 @@ async def trigger_ebay_login() -> str:
     """
     logger.info("Executing trigger_ebay_login MCP tool.")
     try:
-        loop = asyncio.get_event_loop()
         # Run the synchronous initiate_user_login in a separate thread
         # initiate_user_login handles its own browser opening and local server for callback
-        login_result = await loop.run_in_executor(None, initiate_user_login)
+        login_result = await asyncio.to_thread(initiate_user_login)
         
         if login_result and login_result.get("status") == "success":
             logger.info("trigger_ebay_login: eBay login process completed successfully according to initiate_user_login.")
+            # New tokens were written to the .env, so drop any cached access token
+            invalidate_cached_token()
             # Get the user details if available
             user_name = login_result.get("user_name", "TreadersLoft")
             # Create and return a success response using the Pydantic model
@@ -102,13 +87,13 @@ async def trigger_ebay_login() -> str:
         elif login_result and "error" in login_result:
             error_message = login_result.get("message", "Unknown error")
             error_details = login_result.get("error_details", "No specific error details provided.")
-            logger.error(f"trigger_ebay_login: eBay login process failed. Error: {error_message}, Details: {error_details}")
+            logger.error("trigger_ebay_login: eBay login process failed. Error: %s, Details: %s", error_message, error_details)
             # Create and return an error response using the Pydantic model
             response = TriggerEbayLoginResponse.error_response(error_message, error_details)
             return response.data
         else:
             # This case might occur if initiate_user_login returns None or an unexpected structure
-            logger.warning(f"trigger_ebay_login: eBay login process finished, but the result was unexpected: {login_result}")
+            logger.warning("trigger_ebay_login: eBay login process finished, but the result was unexpected: %s", login_result)
             # Create and return an uncertain response using the Pydantic model
             response = TriggerEbayLoginResponse.uncertain_response(login_result)
             return response.data
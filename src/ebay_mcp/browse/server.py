@@ -6,20 +6,21 @@ import os
 import sys
 import httpx
 from fastmcp import FastMCP
-import json
+import orjson
 from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import browse-related models
 from models.mcp_tools import SearchEbayItemsParams
 
 # Import the common helper function for eBay API calls
 from ebay_service import get_ebay_access_token
-from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers
-from utils.debug_httpx import create_debug_client
+from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers, PARSE_RESPONSES, build_params, decode_api_result
+from utils.debug_httpx import get_http_client
 
 # Load environment variables
 load_dotenv()
@@ -36,39 +37,39 @@ browse_mcp = FastMCP("eBay Browse API")
 @browse_mcp.tool()
 async def search_ebay_items(query: str, limit: int = 10) -> str:
     """Search items on eBay using Browse API"""
-    logger.info(f"Executing search_ebay_items MCP tool with query='{query}', limit={limit}.")
+    logger.info("Executing search_ebay_items MCP tool with query='%s', limit=%s.", query, limit)
     
     # Validate parameters using Pydantic model
     try:
-        params = SearchEbayItemsParams(query=query, limit=limit)
+        params = build_params(SearchEbayItemsParams, query=query, limit=limit)
         
         async def _api_call(access_token: str, client: httpx.AsyncClient):
             # Use standardized eBay API headers
             headers = get_standard_ebay_headers(access_token)
             api_params = {"q": params.query, "limit": params.limit}
             url = "https://api.ebay.com/buy/browse/v1/item_summary/search"
-            logger.debug(f"search_ebay_items: Requesting URL: {url} with params: {api_params} using token {access_token[:10]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("search_ebay_items: Requesting URL: %s with params: %s using token %s...", url, api_params, access_token[:10])
             
             response = await client.get(url, headers=headers, params=api_params)
-            logger.debug(f"search_ebay_items: Response status: {response.status_code}")
+            logger.debug("search_ebay_items: Response status: %s", response.status_code)
             response.raise_for_status() # Crucial for execute_ebay_api_call to handle HTTP errors
             logger.info("search_ebay_items: Successfully fetched items.")
-            return response.text    
+            return response.content # Raw bytes; decoded once at the final return
         
-        # Use the enhanced debug client
-        async with create_debug_client() as client:
-            result = await execute_ebay_api_call("search_ebay_items", client, _api_call)
+        # Reuse the shared HTTP client
+        client = get_http_client()
+        result = await execute_ebay_api_call("search_ebay_items", client, _api_call)
             
-            # Try to parse the response as a SearchResult
+        # Optionally parse the response for summary logging only (error messages come back as str, not bytes)
+        if PARSE_RESPONSES and isinstance(result, bytes):
             try:
-                if not result.startswith('Token acquisition failed') and not result.startswith('HTTPX RequestError'):
-                    result_json = json.loads(result)
-                    logger.info(f"Parsed search results: {len(result_json.get('itemSummaries', []))} items found")
-                    return result
+                result_json = orjson.loads(result)
+                logger.info("Parsed search results: %s items found", len(result_json.get('itemSummaries', [])))
             except Exception as e:
-                logger.warning(f"Failed to parse search results: {str(e)}")
+                logger.warning("Failed to parse search results: %s", e)
             
-            return result
+        return decode_api_result(result)
     except Exception as e:
-        logger.error(f"Error in search_ebay_items: {str(e)}")
+        logger.error("Error in search_ebay_items: %s", e)
         return f"Error in search parameters: {str(e)}"
@@ -6,19 +6,19 @@ import os
 import sys
 import httpx
 from fastmcp import FastMCP
-import json
+import orjson
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import inventory-related models
-from models.ebay.inventory import InventoryItemsListResponse
 from models.mcp_tools import GetInventoryItemsParams
 
 # Import the common helper function for eBay API calls
-from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers, is_token_error
-from utils.debug_httpx import create_debug_client
+from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers, is_token_error, build_params, PARSE_RESPONSES, decode_api_result
+from utils.debug_httpx import get_http_client
 
 # Get logger
 logger = logging.getLogger(__name__)
@@ -33,11 +33,11 @@ async def get_inventory_items_tool(inventory_mcp):
             limit: The maximum number of inventory items to return per page (1-200, default: 25).
             offset: The number of inventory items to skip before starting to return results (default: 0).
         """
-        logger.info(f"Executing get_inventory_items MCP tool with limit={limit}, offset={offset}.")
+        logger.info("Executing get_inventory_items MCP tool with limit=%s, offset=%s.", limit, offset)
         
         # Validate parameters using Pydantic model
         try:
-            params = GetInventoryItemsParams(limit=limit, offset=offset)
+            params = build_params(GetInventoryItemsParams, limit=limit, offset=offset)
             
             async def _api_call(access_token: str, client: httpx.AsyncClient):
                 # Use standardized eBay API headers
@@ -51,41 +51,38 @@ async def get_inventory_items_tool(inventory_mcp):
                     "offset": str(params.offset)
                 }
                 
-                log_headers = headers.copy()
-                log_headers['Authorization'] = f"Bearer {access_token[:20]}...<truncated>"
-                logger.debug(f"get_inventory_items: Headers for API call: {log_headers}")
-                logger.debug(f"get_inventory_items: Request URL: {base_url} with params: {query_params} using token {access_token[:10]}...")
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_headers = headers.copy()
+                    log_headers['Authorization'] = f"Bearer {access_token[:20]}...<truncated>"
+                    logger.debug("get_inventory_items: Headers for API call: %s", log_headers)
+                    logger.debug("get_inventory_items: Request URL: %s with params: %s using token %s...", base_url, query_params, access_token[:10])
                 
                 # Make the API call to get inventory items with pagination
                 response = await client.get(base_url, headers=headers, params=query_params)
-                logger.info(f"get_inventory_items: API response status: {response.status_code}")
-                response_text_snippet = response.text[:500] if response.text else "[Empty Response Body]"
-                logger.debug(f"get_inventory_items: API response text (first 500 chars): {response_text_snippet}...")
+                logger.info("get_inventory_items: API response status: %s", response.status_code)
+                if logger.isEnabledFor(logging.DEBUG):
+                    response_text_snippet = response.text[:500] if response.text else "[Empty Response Body]"
+                    logger.debug("get_inventory_items: API response text (first 500 chars): %s...", response_text_snippet)
                 
                 # Raise for status to trigger error handling in execute_ebay_api_call
                 response.raise_for_status()
                 
-                logger.info(f"get_inventory_items: Successfully retrieved inventory items with limit={params.limit}, offset={params.offset}.")
-                return response.text
+                logger.info("get_inventory_items: Successfully retrieved inventory items with limit=%s, offset=%s.", params.limit, params.offset)
+                return response.content # Raw bytes; decoded once at the final return
             
-            # Use the enhanced debug client
-            async with create_debug_client() as client:
-                result = await execute_ebay_api_call("get_inventory_items", client, _api_call)
+            # Reuse the shared HTTP client
+            client = get_http_client()
+            result = await execute_ebay_api_call("get_inventory_items", client, _api_call)
                 
-                # Try to parse the response as an InventoryItemsListResponse
+            # Optionally parse for logging only (error messages come back as str, not bytes); the original JSON is returned unchanged
+            if PARSE_RESPONSES and isinstance(result, bytes):
                 try:
-                    if not result.startswith('Token acquisition failed') and not result.startswith('HTTPX RequestError'):
-                        result_json = json.loads(result)
-                        
-                        # Create Pydantic model for the inventory items list
-                        inventory_list_response = InventoryItemsListResponse.success_response(result_json)
-                        logger.info(f"Parsed inventory items list with {len(inventory_list_response.inventory_items)} items")
-                        # Return the original JSON for backward compatibility
-                        return result
+                    result_json = orjson.loads(result)
+                    logger.info("Parsed inventory items list with %s items", len(result_json.get('inventoryItems', [])))
                 except Exception as e:
-                    logger.warning(f"Failed to parse inventory items list: {str(e)}")
+                    logger.warning("Failed to parse inventory items list: %s", e)
                 
-                return result
+            return decode_api_result(result)
         except Exception as e:
-            logger.error(f"Error in get_inventory_items: {str(e)}")
+            logger.error("Error in get_inventory_items: %s", e)
             return f"Error in inventory items parameters: {str(e)}"
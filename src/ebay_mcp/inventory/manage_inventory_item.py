@@ -6,6 +6,7 @@ import os
 import sys
 import httpx
 import json
+import orjson
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
@@ -13,7 +14,8 @@ from pydantic import Field
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from models.ebay.inventory import (
     ShipToLocationAvailability,
@@ -26,11 +28,15 @@ from models.ebay.inventory import (
     ManageInventoryItemResponseDetails,
     ManageInventoryItemToolResponse,
 )
-from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers
-from utils.debug_httpx import create_debug_client
+from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers, ACCEPT_JSON_HEADERS
+from utils.debug_httpx import get_http_client
+from .manage_offer import invalidate_cached_offer
 
 logger = logging.getLogger(__name__)
 
+# Inventory API inventory item endpoint; per-SKU URLs are built from it once per call
+INVENTORY_ITEM_URL = "https://api.ebay.com/sell/inventory/v1/inventory_item"
+
 
 def _normalize_for_comparison(value: Any) -> str:
     """Normalize values for comparison, handling None, numbers, and strings consistently."""
@@ -89,26 +95,26 @@ def _deep_compare_list(list1: List[Any], list2: List[Any]) -> bool:
 
 async def _get_inventory_item_by_sku(sku: str, access_token: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
     """Helper to fetch an inventory item by SKU."""
-    headers = get_standard_ebay_headers(access_token)
-    headers['Accept'] = 'application/json'  # Ensure JSON response
-    url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{sku}"
-    logger.info(f"_get_inventory_item_by_sku: Fetching inventory item for SKU '{sku}' from {url}")
+    headers = get_standard_ebay_headers(access_token, ACCEPT_JSON_HEADERS) # Ensure JSON response
+    url = f"{INVENTORY_ITEM_URL}/{sku}"
+    logger.info("_get_inventory_item_by_sku: Fetching inventory item for SKU '%s' from %s", sku, url)
     
     response = await client.get(url, headers=headers)
-    log_headers = headers.copy()
-    log_headers['Authorization'] = f"Bearer {access_token[:20]}...<truncated>"
-    logger.debug(f"_get_inventory_item_by_sku: Headers: {log_headers}, URL: {url}")
-    logger.debug(f"_get_inventory_item_by_sku: Response status: {response.status_code}, text: {response.text[:500]}...")
+    if logger.isEnabledFor(logging.DEBUG):
+        log_headers = headers.copy()
+        log_headers['Authorization'] = f"Bearer {access_token[:20]}...<truncated>"
+        logger.debug("_get_inventory_item_by_sku: Headers: %s, URL: %s", log_headers, url)
+        logger.debug("_get_inventory_item_by_sku: Response status: %s, text: %s...", response.status_code, response.text[:500])
 
     if response.status_code == 200:
-        response_data = response.json()
-        logger.info(f"_get_inventory_item_by_sku: Found inventory item for SKU '{sku}'")
+        response_data = orjson.loads(response.content)
+        logger.info("_get_inventory_item_by_sku: Found inventory item for SKU '%s'", sku)
         return response_data
     elif response.status_code == 404:
-        logger.info(f"_get_inventory_item_by_sku: No inventory item found for SKU '{sku}' (404 Not Found).")
+        logger.info("_get_inventory_item_by_sku: No inventory item found for SKU '%s' (404 Not Found).", sku)
         return None
     else:
-        logger.error(f"_get_inventory_item_by_sku: Error fetching inventory item for SKU '{sku}'. Status: {response.status_code}, Response: {response.text[:500]}")
+        logger.error("_get_inventory_item_by_sku: Error fetching inventory item for SKU '%s'. Status: %s, Response: %s", sku, response.status_code, response.text[:500])
         response.raise_for_status()  # Let execute_ebay_api_call's wrapper handle it
         return None  # Should not be reached
 
@@ -124,10 +130,11 @@ async def manage_inventory_item_tool(inventory_mcp):
         """
         # Parameters are now automatically validated by FastMCP against ManageInventoryItemToolInput
         # Access them via params.sku, params.action, params.item_data
-        logger.info(f"Executing manage_inventory_item MCP tool: SKU='{params.sku}', Action='{params.action.value}'")
+        logger.info("Executing manage_inventory_item MCP tool: SKU='%s', Action='%s'", params.sku, params.action.value)
 
         async def _api_call_logic(access_token: str, client: httpx.AsyncClient): # params is available in this scope
             headers = get_standard_ebay_headers(access_token)
+            item_url = f"{INVENTORY_ITEM_URL}/{params.sku}"
             
             current_item = None
 
@@ -188,14 +195,15 @@ async def manage_inventory_item_tool(inventory_mcp):
                         "availability.ship_to_location_availability.quantity is required for 'create' action."
                     )
 
-                payload = params.item_data.model_dump(exclude_none=True, by_alias=True) # API payload needs camelCase
+                # Serialise straight to JSON bytes; API payload needs camelCase. Content-Type is set by the standard headers.
+                payload = params.item_data.model_dump_json(exclude_none=True, by_alias=True).encode()
                 
-                url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{params.sku}"
-                logger.debug(f"manage_inventory_item (CREATE): URL: {url}, Payload: {payload}")
-                response = await client.put(url, headers=headers, json=payload)
+                url = item_url
+                logger.debug("manage_inventory_item (CREATE): URL: %s, Payload: %s", url, payload)
+                response = await client.put(url, headers=headers, content=payload)
                 response.raise_for_status()
                 
-                logger.info(f"manage_inventory_item (CREATE): Successfully created inventory item for SKU '{params.sku}'. Status: {response.status_code}. Verifying...")
+                logger.info("manage_inventory_item (CREATE): Successfully created inventory item for SKU '%s'. Status: %s. Verifying...", params.sku, response.status_code)
 
                 # Verification step
                 verified_item = await _get_inventory_item_by_sku(params.sku, access_token, client)
@@ -203,7 +211,7 @@ async def manage_inventory_item_tool(inventory_mcp):
                     # This could be a transient issue, but we'll treat it as a failure for now.
                     raise ValueError(f"VERIFICATION FAILED: Could not retrieve inventory item for SKU '{params.sku}' immediately after creation.")
 
-                logger.info(f"manage_inventory_item (CREATE): Verification successful for SKU '{params.sku}'.")
+                logger.info("manage_inventory_item (CREATE): Verification successful for SKU '%s'.", params.sku)
                 return ManageInventoryItemToolResponse.success_response(
                     ManageInventoryItemResponseDetails(sku=params.sku, status_code=response.status_code, message="Inventory item created and verified successfully.", details=verified_item)
                 ).model_dump_json(indent=2)
@@ -216,8 +224,8 @@ async def manage_inventory_item_tool(inventory_mcp):
                     raise ValueError("item_data is unexpectedly None for 'modify' action.")
 
                 # Merge current_item with new data. eBay's PUT is a full replacement.
-                # Start with all fields from current_item, then update with provided non-None fields.
-                update_payload = current_item.copy() # Start with all fields from the fetched item
+                # The fetched item dict is only used here, so update it in place with provided non-None fields.
+                update_payload = current_item
                 provided_updates = params.item_data.model_dump(exclude_none=True, by_alias=True) # Get updates with camelCase keys
                 update_payload.update(provided_updates) # Override with new values
                 
@@ -226,20 +234,20 @@ async def manage_inventory_item_tool(inventory_mcp):
                 for field in ebay_managed_fields:
                     update_payload.pop(field, None)
 
-                url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{params.sku}"
-                logger.debug(f"manage_inventory_item (MODIFY): URL: {url}, Payload: {update_payload}")
-                response = await client.put(url, headers=headers, json=update_payload)
+                url = item_url
+                logger.debug("manage_inventory_item (MODIFY): URL: %s, Payload: %s", url, update_payload)
+                response = await client.put(url, headers=headers, content=orjson.dumps(update_payload))
                 response.raise_for_status() # Expect 200 or 204
-                logger.info(f"manage_inventory_item (MODIFY): Successfully submitted modification for inventory item '{params.sku}'. Verifying...")
+                logger.info("manage_inventory_item (MODIFY): Successfully submitted modification for inventory item '%s'. Verifying...", params.sku)
 
                 # Enhanced Verification step
                 verified_item = await _get_inventory_item_by_sku(params.sku, access_token, client)
                 if not verified_item:
                     raise ValueError(f"VERIFICATION FAILED: Could not retrieve inventory item for SKU '{params.sku}' immediately after modification.")
 
-                # Create expected final state: original item + modifications
-                expected_final_state = current_item.copy()
-                expected_final_state.update(provided_updates)
+                # Expected final state is the merged payload we sent: original item + modifications.
+                # The eBay-managed fields removed above are skipped by the comparison anyway.
+                expected_final_state = update_payload
                 
                 # Comprehensive verification: compare expected vs actual final state
                 discrepancies = []
@@ -272,10 +280,10 @@ async def manage_inventory_item_tool(inventory_mcp):
                 message = "Inventory item modified and verified successfully."
                 if discrepancies:
                     discrepancy_details = '; '.join(discrepancies)
-                    logger.warning(f"Enhanced verification for SKU '{params.sku}' found discrepancies: {discrepancy_details}")
+                    logger.warning("Enhanced verification for SKU '%s' found discrepancies: %s", params.sku, discrepancy_details)
                     message = f"Inventory item modified. Enhanced verification found discrepancies: {discrepancy_details}"
                 else:
-                    logger.info(f"manage_inventory_item (MODIFY): Enhanced verification successful for SKU '{params.sku}'. All fields match expected state.")
+                    logger.info("manage_inventory_item (MODIFY): Enhanced verification successful for SKU '%s'. All fields match expected state.", params.sku)
 
                 return ManageInventoryItemToolResponse.success_response(
                     ManageInventoryItemResponseDetails(sku=params.sku, status_code=response.status_code, message=message, details=verified_item)
@@ -286,7 +294,7 @@ async def manage_inventory_item_tool(inventory_mcp):
                 if not current_item: # Should be caught by the check at the top of the function
                     raise ValueError(f"No inventory item found for SKU '{params.sku}'.")
 
-                logger.info(f"manage_inventory_item (GET): Successfully retrieved inventory item for SKU '{params.sku}'.")
+                logger.info("manage_inventory_item (GET): Successfully retrieved inventory item for SKU '%s'.", params.sku)
                 
                 return ManageInventoryItemToolResponse.success_response(
                     ManageInventoryItemResponseDetails(
@@ -299,11 +307,12 @@ async def manage_inventory_item_tool(inventory_mcp):
 
             # --- DELETE Action --- 
             elif params.action == ManageInventoryItemAction.DELETE:
-                url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{params.sku}"
-                logger.debug(f"manage_inventory_item (DELETE): URL: {url}")
+                url = item_url
+                logger.debug("manage_inventory_item (DELETE): URL: %s", url)
                 response = await client.delete(url, headers=headers)
                 response.raise_for_status() # Expect 204 No Content
-                logger.info(f"manage_inventory_item (DELETE): Successfully deleted inventory item for SKU '{params.sku}'.")
+                invalidate_cached_offer(params.sku) # eBay deletes the SKU's offers along with the item
+                logger.info("manage_inventory_item (DELETE): Successfully deleted inventory item for SKU '%s'.", params.sku)
                 return ManageInventoryItemToolResponse.success_response(
                     ManageInventoryItemResponseDetails(sku=params.sku, status_code=response.status_code, message="Inventory item deleted successfully.", details=None)
                 ).model_dump_json(indent=2)
@@ -313,23 +322,23 @@ async def manage_inventory_item_tool(inventory_mcp):
                 raise ValueError(f"Unhandled action: {params.action.value}")
 
         try:
-            async with create_debug_client() as client:
-                # The execute_ebay_api_call handles token acquisition and basic error wrapping
-                # It expects _api_call_logic to return the final JSON string or raise an error
-                result_str = await execute_ebay_api_call(f"manage_inventory_item_{params.action.value}", client, _api_call_logic)
-                return result_str # result_str is already a JSON string from _api_call_logic
+            client = get_http_client()
+            # The execute_ebay_api_call handles token acquisition and basic error wrapping
+            # It expects _api_call_logic to return the final JSON string or raise an error
+            result_str = await execute_ebay_api_call(f"manage_inventory_item_{params.action.value}", client, _api_call_logic)
+            return result_str # result_str is already a JSON string from _api_call_logic
         except ValueError as ve: # Catch specific validation/logic errors from _api_call_logic
-            logger.error(f"ValueError in manage_inventory_item ({params.action.value}) for SKU '{params.sku}': {ve}")
+            logger.error("ValueError in manage_inventory_item (%s) for SKU '%s': %s", params.action.value, params.sku, ve)
             return ManageInventoryItemToolResponse.error_response(str(ve)).model_dump_json(indent=2)
         except httpx.HTTPStatusError as hse:
-            logger.error(f"HTTPStatusError in manage_inventory_item ({params.action.value}) for SKU '{params.sku}': {hse.response.status_code} - {hse.response.text[:500]}")
+            logger.error("HTTPStatusError in manage_inventory_item (%s) for SKU '%s': %s - %s", params.action.value, params.sku, hse.response.status_code, hse.response.text[:500])
             error_details = hse.response.text
             try:
-                error_json = hse.response.json()
+                error_json = orjson.loads(hse.response.content)
                 error_details = error_json.get('errors', [{}])[0].get('message', hse.response.text)
             except Exception:
                 pass # Keep raw text if not JSON
             return ManageInventoryItemToolResponse.error_response(f"eBay API Error ({hse.response.status_code}): {error_details}").model_dump_json(indent=2)
         except Exception as e:
-            logger.exception(f"Unexpected error in manage_inventory_item ({params.action.value}) for SKU '{params.sku}': {e}")
+            logger.exception("Unexpected error in manage_inventory_item (%s) for SKU '%s': %s", params.action.value, params.sku, e)
             return ManageInventoryItemToolResponse.error_response(f"Unexpected error: {str(e)}").model_dump_json(indent=2)
\ No newline at end of file
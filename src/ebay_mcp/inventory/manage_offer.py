@@ -4,16 +4,19 @@ eBay Inventory MCP Server - Manage Offer Functionality (Create, Modify, Withdraw
 import logging
 import os
 import sys
+import time
 import httpx
 import json
+import orjson
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import Field
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from models.ebay.inventory import (
     ManageOfferAction,
@@ -23,12 +26,25 @@ from models.ebay.inventory import (
     ManageOfferResponseDetails,
     ManageOfferToolResponse,
 )
-from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers
-from utils.debug_httpx import create_debug_client
+from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers, ACCEPT_JSON_HEADERS
+from utils.debug_httpx import get_http_client
 from ..config import ebay_offer_defaults
 
 logger = logging.getLogger(__name__)
 
+# Inventory API offer endpoint; per-offer URLs are built from it once per call
+OFFER_URL = "https://api.ebay.com/sell/inventory/v1/offer"
+
+# Pre-encoded body for POSTs that take an empty JSON object (withdraw, publish)
+EMPTY_JSON_BODY = b"{}"
+
+# Short-lived cache of offers fetched by SKU, used to skip the lookup before withdraw/publish
+# when the same SKU is worked on repeatedly. Disabled by default; enable with EBAY_ENABLE_OFFER_CACHE=1.
+ENABLE_OFFER_CACHE = os.getenv('EBAY_ENABLE_OFFER_CACHE', '0') == '1'
+OFFER_CACHE_TTL_SECONDS = 30
+OFFER_CACHE_MAX_SIZE = 512
+_offer_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # sku -> (monotonic expiry, offer)
+
 
 def _normalize_for_comparison(value: Any) -> str:
     """Normalize values for comparison, handling None, numbers, and strings consistently."""
@@ -90,35 +106,79 @@ def _deep_compare_list(list1: List[Any], list2: List[Any]) -> bool:
 
 async def _get_offer_by_sku(sku: str, access_token: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
     """Helper to fetch an offer by SKU. Returns the first offer object if found."""
-    headers = get_standard_ebay_headers(access_token)
-    headers['Accept'] = 'application/json' # Ensure JSON response
-    url = f"https://api.ebay.com/sell/inventory/v1/offer?sku={sku}"
-    logger.info(f"_get_offer_by_sku: Fetching offer for SKU '{sku}' from {url}")
+    headers = get_standard_ebay_headers(access_token, ACCEPT_JSON_HEADERS) # Ensure JSON response
+    url = f"{OFFER_URL}?sku={sku}"
+    logger.info("_get_offer_by_sku: Fetching offer for SKU '%s' from %s", sku, url)
     
     response = await client.get(url, headers=headers)
-    log_headers = headers.copy()
-    log_headers['Authorization'] = f"Bearer {access_token[:20]}...<truncated>"
-    logger.debug(f"_get_offer_by_sku: Headers: {log_headers}, URL: {url}")
-    logger.debug(f"_get_offer_by_sku: Response status: {response.status_code}, text: {response.text[:500]}...")
+    if logger.isEnabledFor(logging.DEBUG):
+        log_headers = headers.copy()
+        log_headers['Authorization'] = f"Bearer {access_token[:20]}...<truncated>"
+        logger.debug("_get_offer_by_sku: Headers: %s, URL: %s", log_headers, url)
+        logger.debug("_get_offer_by_sku: Response status: %s, text: %s...", response.status_code, response.text[:500])
 
     if response.status_code == 200:
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         offers = response_data.get("offers", [])
         if offers:
-            logger.info(f"_get_offer_by_sku: Found offer for SKU '{sku}': {offers[0].get('offerId')}")
+            logger.info("_get_offer_by_sku: Found offer for SKU '%s': %s", sku, offers[0].get('offerId'))
             return offers[0]
         else:
-            logger.info(f"_get_offer_by_sku: No offer found for SKU '{sku}' (200 OK, but no offers array).")
+            logger.info("_get_offer_by_sku: No offer found for SKU '%s' (200 OK, but no offers array).", sku)
             return None
     elif response.status_code == 404:
-        logger.info(f"_get_offer_by_sku: No offer found for SKU '{sku}' (404 Not Found).")
+        logger.info("_get_offer_by_sku: No offer found for SKU '%s' (404 Not Found).", sku)
         return None
     else:
-        logger.error(f"_get_offer_by_sku: Error fetching offer for SKU '{sku}'. Status: {response.status_code}, Response: {response.text[:500]}")
+        logger.error("_get_offer_by_sku: Error fetching offer for SKU '%s'. Status: %s, Response: %s", sku, response.status_code, response.text[:500])
         response.raise_for_status() # Let execute_ebay_api_call's wrapper handle it
         return None # Should not be reached
 
 
+def _is_noop_update(current: Dict[str, Any], updates: Dict[str, Any]) -> bool:
+    """True when merging updates into current (top-level replacement, as MODIFY does) would change nothing."""
+    for key, value in updates.items():
+        if key not in current:
+            return False
+        current_value = current[key]
+        if isinstance(value, dict) and isinstance(current_value, dict):
+            # Top-level replacement drops keys missing from the update, so compare both ways
+            if not (_deep_compare_dict(value, current_value) and _deep_compare_dict(current_value, value)):
+                return False
+        elif not _deep_compare_dict({key: value}, {key: current_value}):
+            return False
+    return True
+
+
+def _cache_offer(sku: str, offer: Optional[Dict[str, Any]]) -> None:
+    """Stores an offer in the offer cache, or drops the SKU's entry when offer is None."""
+    if not ENABLE_OFFER_CACHE:
+        return
+    _offer_cache.pop(sku, None)
+    if offer is None:
+        return
+    if len(_offer_cache) >= OFFER_CACHE_MAX_SIZE:
+        _offer_cache.pop(next(iter(_offer_cache)))  # Evict the oldest entry
+    _offer_cache[sku] = (time.monotonic() + OFFER_CACHE_TTL_SECONDS, offer)
+
+
+def invalidate_cached_offer(sku: str) -> None:
+    """Drops the SKU's cached offer, e.g. after a change that replaces or removes the offer on eBay."""
+    _offer_cache.pop(sku, None)
+
+
+async def _get_current_offer(sku: str, access_token: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+    """Returns the offer for a SKU from the offer cache if fresh, otherwise fetches and caches it."""
+    if ENABLE_OFFER_CACHE:
+        entry = _offer_cache.get(sku)
+        if entry and entry[0] > time.monotonic():
+            logger.info("_get_current_offer: Using cached offer for SKU '%s'", sku)
+            return entry[1]
+    offer = await _get_offer_by_sku(sku, access_token, client)
+    _cache_offer(sku, offer)
+    return offer
+
+
 async def manage_offer_tool(inventory_mcp):
     @inventory_mcp.tool()
     async def manage_offer(params: ManageOfferToolInput) -> str:
@@ -130,7 +190,7 @@ async def manage_offer_tool(inventory_mcp):
         """
         # Parameters are now automatically validated by FastMCP against ManageOfferToolInput
         # Access them via params.sku, params.action, params.offer_data
-        logger.info(f"Executing manage_offer MCP tool: SKU='{params.sku}', Action='{params.action.value}'")
+        logger.info("Executing manage_offer MCP tool: SKU='%s', Action='%s'", params.sku, params.action.value)
 
         async def _api_call_logic(access_token: str, client: httpx.AsyncClient): # params is available in this scope
             headers = get_standard_ebay_headers(access_token)
@@ -140,11 +200,18 @@ async def manage_offer_tool(inventory_mcp):
 
             # For modify, withdraw, publish - first get the offer to get offerId and current state
             # The 'params' variable from the outer scope (manage_offer function) is used here.
+            # GET and MODIFY always read through to eBay: MODIFY builds its full-replacement payload from the
+            # current offer and may skip the write entirely, so it must not act on a stale copy.
+            # Withdraw and publish only need the offerId and may use a recently cached offer.
             if params.action in [ManageOfferAction.MODIFY, ManageOfferAction.WITHDRAW, ManageOfferAction.PUBLISH, ManageOfferAction.GET]:
-                current_offer = await _get_offer_by_sku(params.sku, access_token, client)
+                if params.action in [ManageOfferAction.GET, ManageOfferAction.MODIFY]:
+                    current_offer = await _get_offer_by_sku(params.sku, access_token, client)
+                else:
+                    current_offer = await _get_current_offer(params.sku, access_token, client)
                 if not current_offer:
                     raise ValueError(f"No existing offer found for SKU '{params.sku}' to perform '{params.action.value}'.")
                 offer_id_from_current = current_offer.get('offerId')
+                offer_url = f"{OFFER_URL}/{offer_id_from_current}"
                 # For GET, we can proceed even without an offerId, but for others it's critical.
                 if not offer_id_from_current and params.action not in [ManageOfferAction.GET]:
                     raise ValueError(f"Could not retrieve offerId for SKU '{params.sku}' to perform '{params.action.value}'.")
@@ -199,16 +266,17 @@ async def manage_offer_tool(inventory_mcp):
                     if field not in payload or payload[field] is None:
                         raise ValueError(f"Missing required field '{field}' in final payload for 'create' action.")
                 
-                url = "https://api.ebay.com/sell/inventory/v1/offer"
-                logger.debug(f"manage_offer (CREATE): URL: {url}, Payload: {payload}")
-                response = await client.post(url, headers=headers, json=payload)
+                url = OFFER_URL
+                logger.debug("manage_offer (CREATE): URL: %s, Payload: %s", url, payload)
+                response = await client.post(url, headers=headers, content=orjson.dumps(payload))
                 response.raise_for_status()
-                response_json = response.json()
+                response_json = orjson.loads(response.content)
                 new_offer_id = response_json.get('offerId')
-                logger.info(f"manage_offer (CREATE): Successfully created offer for SKU '{params.sku}'. New OfferId: {new_offer_id}. Verifying...")
+                logger.info("manage_offer (CREATE): Successfully created offer for SKU '%s'. New OfferId: %s. Verifying...", params.sku, new_offer_id)
 
                 # Verification step
                 verified_offer = await _get_offer_by_sku(params.sku, access_token, client)
+                _cache_offer(params.sku, verified_offer)
                 if not verified_offer:
                     # This could be a transient issue, but we'll treat it as a failure for now.
                     raise ValueError(f"VERIFICATION FAILED: Could not retrieve offer for SKU '{params.sku}' immediately after creation.")
@@ -216,10 +284,10 @@ async def manage_offer_tool(inventory_mcp):
                 # Simple verification: check if a key field matches.
                 # Note: eBay might transform or default some values. This is a basic check.
                 if payload.get('categoryId') != verified_offer.get('categoryId'):
-                    logger.warning(f"Verification discrepancy for SKU '{params.sku}'. Sent categoryId '{payload.get('categoryId')}', but found '{verified_offer.get('categoryId')}' in fetched offer.")
+                    logger.warning("Verification discrepancy for SKU '%s'. Sent categoryId '%s', but found '%s' in fetched offer.", params.sku, payload.get('categoryId'), verified_offer.get('categoryId'))
                     # For now, we will still return success but include the fetched data.
 
-                logger.info(f"manage_offer (CREATE): Verification successful for SKU '{params.sku}'.")
+                logger.info("manage_offer (CREATE): Verification successful for SKU '%s'.", params.sku)
                 return ManageOfferToolResponse.success_response(
                     ManageOfferResponseDetails(offer_id=new_offer_id, status_code=response.status_code, message="Offer created and verified successfully.", details=verified_offer)
                 ).model_dump_json(indent=2)
@@ -235,28 +303,36 @@ async def manage_offer_tool(inventory_mcp):
                     raise ValueError("offer_data is unexpectedly None for 'modify' action.")
 
 
-                # Merge current_offer with new data. eBay's updateOffer is a full replacement.
-                # Start with all fields from current_offer, then update with provided non-None fields.
-                update_payload = current_offer.copy() # Start with all fields from the fetched offer
                 provided_updates = params.offer_data.model_dump(exclude_none=True, by_alias=True)
+
+                # Skip the PUT and verification round-trips when the freshly fetched offer already has the requested values
+                if _is_noop_update(current_offer, provided_updates):
+                    logger.info("manage_offer (MODIFY): Offer '%s' for SKU '%s' already matches the requested values. Skipping update.", offer_id_from_current, params.sku)
+                    return ManageOfferToolResponse.success_response(
+                        ManageOfferResponseDetails(offer_id=offer_id_from_current, skipped=True, message="No changes needed; offer already matches the requested values. No update was sent.", details=current_offer)
+                    ).model_dump_json(indent=2)
+
+                # Merge current_offer with new data. eBay's updateOffer is a full replacement.
+                # The fetched offer dict is only used here, so update it in place with provided non-None fields.
+                update_payload = current_offer
                 update_payload.update(provided_updates) # Override with new values
                 
                 # The above .update() merges the camelCase keys from the API with the aliased camelCase keys from our model.
 
-                url = f"https://api.ebay.com/sell/inventory/v1/offer/{offer_id_from_current}"
-                logger.debug(f"manage_offer (MODIFY): URL: {url}, Payload: {update_payload}")
-                response = await client.put(url, headers=headers, json=update_payload)
+                url = offer_url
+                logger.debug("manage_offer (MODIFY): URL: %s, Payload: %s", url, update_payload)
+                response = await client.put(url, headers=headers, content=orjson.dumps(update_payload))
                 response.raise_for_status() # Expect 204 No Content
-                logger.info(f"manage_offer (MODIFY): Successfully submitted modification for offer '{offer_id_from_current}' for SKU '{params.sku}'. Verifying...")
+                logger.info("manage_offer (MODIFY): Successfully submitted modification for offer '%s' for SKU '%s'. Verifying...", offer_id_from_current, params.sku)
 
                 # Enhanced Verification step
                 verified_offer = await _get_offer_by_sku(params.sku, access_token, client)
+                _cache_offer(params.sku, verified_offer)
                 if not verified_offer:
                     raise ValueError(f"VERIFICATION FAILED: Could not retrieve offer for SKU '{params.sku}' immediately after modification.")
 
-                # Create expected final state: original offer + modifications
-                expected_final_state = current_offer.copy()
-                expected_final_state.update(provided_updates)
+                # Expected final state is the merged payload we sent: original offer + modifications
+                expected_final_state = update_payload
                 
                 # Comprehensive verification: compare expected vs actual final state
                 discrepancies = []
@@ -289,10 +365,10 @@ async def manage_offer_tool(inventory_mcp):
                 message = "Offer modified and verified successfully."
                 if discrepancies:
                     discrepancy_details = '; '.join(discrepancies)
-                    logger.warning(f"Enhanced verification for SKU '{params.sku}' found discrepancies: {discrepancy_details}")
+                    logger.warning("Enhanced verification for SKU '%s' found discrepancies: %s", params.sku, discrepancy_details)
                     message = f"Offer modified. Enhanced verification found discrepancies: {discrepancy_details}"
                 else:
-                    logger.info(f"manage_offer (MODIFY): Enhanced verification successful for SKU '{params.sku}'. All fields match expected state.")
+                    logger.info("manage_offer (MODIFY): Enhanced verification successful for SKU '%s'. All fields match expected state.", params.sku)
 
                 return ManageOfferToolResponse.success_response(
                     ManageOfferResponseDetails(offer_id=offer_id_from_current, status_code=response.status_code, message=message, details=verified_offer)
@@ -303,18 +379,17 @@ async def manage_offer_tool(inventory_mcp):
                 if not offer_id_from_current:
                     raise ValueError("Missing offer_id for withdraw action.") # Should be caught
 
-                url = f"https://api.ebay.com/sell/inventory/v1/offer/{offer_id_from_current}/withdraw"
-                logger.debug(f"manage_offer (WITHDRAW): URL: {url}")
+                url = f"{offer_url}/withdraw"
+                logger.debug("manage_offer (WITHDRAW): URL: %s", url)
                 # Withdraw request typically has an empty body, but API might expect Content-Type: application/json
                 # The withdraw_offer.py example sends an empty JSON body {}
-                # Let's ensure Content-Type is set if sending json={} even if empty.
-                headers_withdraw = headers.copy()
-                headers_withdraw['Content-Type'] = 'application/json' # Often required even for empty body POSTs
-                response = await client.post(url, headers=headers_withdraw, json={}) # Empty JSON body
+                # The standard headers already carry Content-Type: application/json, so no per-call copy is needed.
+                response = await client.post(url, headers=headers, content=EMPTY_JSON_BODY) # Empty JSON body
                 response.raise_for_status() # Expect 200 OK with potentially empty body
-                logger.info(f"manage_offer (WITHDRAW): Successfully withdrew offer '{offer_id_from_current}' for SKU '{params.sku}'.")
+                invalidate_cached_offer(params.sku) # Offer status changed; drop any cached copy
+                logger.info("manage_offer (WITHDRAW): Successfully withdrew offer '%s' for SKU '%s'.", offer_id_from_current, params.sku)
                 return ManageOfferToolResponse.success_response(
-                    ManageOfferResponseDetails(offer_id=offer_id_from_current, status_code=response.status_code, message="Offer withdrawn successfully.", details=response.text or None)
+                    ManageOfferResponseDetails(offer_id=offer_id_from_current, status_code=response.status_code, message="Offer withdrawn successfully.", details=response.text if response.content else None)
                 ).model_dump_json(indent=2)
 
             # --- PUBLISH Action --- 
@@ -322,13 +397,14 @@ async def manage_offer_tool(inventory_mcp):
                 if not offer_id_from_current:
                     raise ValueError("Missing offer_id for publish action.") # Should be caught
 
-                url = f"https://api.ebay.com/sell/inventory/v1/offer/{offer_id_from_current}/publish"
-                logger.debug(f"manage_offer (PUBLISH): URL: {url}")
-                response = await client.post(url, headers=headers, json={}) # Empty JSON body for publish
+                url = f"{offer_url}/publish"
+                logger.debug("manage_offer (PUBLISH): URL: %s", url)
+                response = await client.post(url, headers=headers, content=EMPTY_JSON_BODY) # Empty JSON body for publish
                 response.raise_for_status() # Expect 200 OK with listingId in body
-                response_json = response.json() if response.text else {}
+                invalidate_cached_offer(params.sku) # Offer status changed; drop any cached copy
+                response_json = orjson.loads(response.content) if response.content else {}
                 listing_id = response_json.get('listingId')
-                logger.info(f"manage_offer (PUBLISH): Successfully published offer '{offer_id_from_current}' for SKU '{params.sku}'. ListingId: {listing_id}")
+                logger.info("manage_offer (PUBLISH): Successfully published offer '%s' for SKU '%s'. ListingId: %s", offer_id_from_current, params.sku, listing_id)
                 return ManageOfferToolResponse.success_response(
                     ManageOfferResponseDetails(offer_id=offer_id_from_current, status_code=response.status_code, message=f"Offer published successfully. ListingId: {listing_id}", details=response_json, listing_id=listing_id)
                 ).model_dump_json(indent=2)
@@ -339,7 +415,7 @@ async def manage_offer_tool(inventory_mcp):
                     raise ValueError(f"No offer found for SKU '{params.sku}'.")
 
                 offer_id = current_offer.get('offerId')
-                logger.info(f"manage_offer (GET): Successfully retrieved offer '{offer_id}' for SKU '{params.sku}'.")
+                logger.info("manage_offer (GET): Successfully retrieved offer '%s' for SKU '%s'.", offer_id, params.sku)
                 
                 # The user wants the output to be like an OfferDataForManage payload.
                 # We return the full offer dictionary from the API in the 'details' field.
@@ -357,23 +433,23 @@ async def manage_offer_tool(inventory_mcp):
                 raise ValueError(f"Unhandled action: {params.action.value}")
 
         try:
-            async with create_debug_client() as client:
-                # The execute_ebay_api_call handles token acquisition and basic error wrapping
-                # It expects _api_call_logic to return the final JSON string or raise an error
-                result_str = await execute_ebay_api_call(f"manage_offer_{params.action.value}", client, _api_call_logic)
-                return result_str # result_str is already a JSON string from _api_call_logic
+            client = get_http_client()
+            # The execute_ebay_api_call handles token acquisition and basic error wrapping
+            # It expects _api_call_logic to return the final JSON string or raise an error
+            result_str = await execute_ebay_api_call(f"manage_offer_{params.action.value}", client, _api_call_logic)
+            return result_str # result_str is already a JSON string from _api_call_logic
         except ValueError as ve: # Catch specific validation/logic errors from _api_call_logic
-            logger.error(f"ValueError in manage_offer ({params.action.value}) for SKU '{params.sku}': {ve}")
+            logger.error("ValueError in manage_offer (%s) for SKU '%s': %s", params.action.value, params.sku, ve)
             return ManageOfferToolResponse.error_response(str(ve)).model_dump_json(indent=2)
         except httpx.HTTPStatusError as hse:
-            logger.error(f"HTTPStatusError in manage_offer ({params.action.value}) for SKU '{params.sku}': {hse.response.status_code} - {hse.response.text[:500]}")
+            logger.error("HTTPStatusError in manage_offer (%s) for SKU '%s': %s - %s", params.action.value, params.sku, hse.response.status_code, hse.response.text[:500])
             error_details = hse.response.text
             try:
-                error_json = hse.response.json()
+                error_json = orjson.loads(hse.response.content)
                 error_details = error_json.get('errors', [{}])[0].get('message', hse.response.text)
             except Exception:
                 pass # Keep raw text if not JSON
             return ManageOfferToolResponse.error_response(f"eBay API Error ({hse.response.status_code}): {error_details}").model_dump_json(indent=2)
         except Exception as e:
-            logger.exception(f"Unexpected error in manage_offer ({params.action.value}) for SKU '{params.sku}': {e}")
+            logger.exception("Unexpected error in manage_offer (%s) for SKU '%s': %s", params.action.value, params.sku, e)
             return ManageOfferToolResponse.error_response(f"Unexpected error: {str(e)}").model_dump_json(indent=2)
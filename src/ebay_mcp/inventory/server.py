@@ -12,7 +12,8 @@ from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import the common helper function for eBay API calls
 from utils.api_utils import execute_ebay_api_call, is_token_error
@@ -4,21 +4,25 @@ eBay Taxonomy MCP Server - Handles eBay Taxonomy APIs
 import logging
 import os
 import sys
+import asyncio
 import httpx
+from typing import Annotated, List, Union
 from fastmcp import FastMCP
-import json
+from pydantic import Field
+import orjson
 from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import taxonomy-related models
 from models.mcp_tools import CategorySuggestionsParams, ItemAspectsParams
 
 # Import the common helper function for eBay API calls
-from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers
-from utils.debug_httpx import create_debug_client
+from utils.api_utils import execute_ebay_api_call, get_standard_ebay_headers, PARSE_RESPONSES, build_params, decode_api_result
+from utils.debug_httpx import get_http_client
 
 # Load environment variables
 load_dotenv()
@@ -26,77 +30,173 @@ load_dotenv()
 # Determine if we're in DEBUG mode
 DEBUG_MODE = os.getenv('MCP_LOG_LEVEL', 'NORMAL').upper() == 'DEBUG'
 
+# Maximum number of concurrent eBay requests issued by the bulk tools
+BULK_CONCURRENCY = 10
+
+# Maximum number of queries / category IDs accepted by one bulk tool call (each one is an eBay request)
+BULK_MAX_ITEMS = 50
+
 # Get logger
 logger = logging.getLogger(__name__)
 
 # Create Taxonomy MCP server
 taxonomy_mcp = FastMCP("eBay Taxonomy API")
 
+
+async def _fetch_category_suggestions(params: CategorySuggestionsParams, client: httpx.AsyncClient) -> Union[bytes, str]:
+    """Fetches category suggestions for a single query. Returns the raw response bytes or an error message."""
+    async def _api_call(access_token: str, client: httpx.AsyncClient):
+        # Use standardized eBay API headers
+        headers = get_standard_ebay_headers(access_token)
+        api_params = {"q": params.query}
+        url = "https://api.ebay.com/commerce/taxonomy/v1/category_tree/3/get_category_suggestions"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("get_category_suggestions: Requesting URL: %s with params: %s using token %s...", url, api_params, access_token[:10])
+
+        response = await client.get(url, headers=headers, params=api_params)
+        logger.debug("get_category_suggestions: Response status: %s", response.status_code)
+        response.raise_for_status()
+        logger.info("get_category_suggestions: Successfully fetched category suggestions.")
+        return response.content
+
+    result = await execute_ebay_api_call("get_category_suggestions", client, _api_call)
+
+    # Optionally parse for logging only (error messages come back as str, not bytes)
+    if PARSE_RESPONSES and isinstance(result, bytes):
+        try:
+            result_json = orjson.loads(result)
+            logger.info("Parsed %s category suggestions", len(result_json.get('categorySuggestions', [])))
+        except Exception as e:
+            logger.warning("Failed to parse category suggestions: %s", e)
+    return result
+
+
+async def _fetch_item_aspects(params: ItemAspectsParams, client: httpx.AsyncClient) -> Union[bytes, str]:
+    """Fetches item aspects for a single category. Returns the raw response bytes or an error message."""
+    async def _api_call(access_token: str, client: httpx.AsyncClient):
+        # Use standardized eBay API headers
+        headers = get_standard_ebay_headers(access_token)
+        url = f"https://api.ebay.com/commerce/taxonomy/v1/category_tree/3/get_item_aspects_for_category"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("get_item_aspects_for_category: Requesting URL: %s with category_id: %s using token %s...", url, params.category_id, access_token[:10])
+
+        response = await client.get(url, headers=headers, params={"category_id": params.category_id})
+        logger.debug("get_item_aspects_for_category: Response status: %s", response.status_code)
+        response.raise_for_status()
+        logger.info("get_item_aspects_for_category: Successfully fetched item aspects.")
+        return response.content
+
+    result = await execute_ebay_api_call("get_item_aspects_for_category", client, _api_call)
+
+    # Optionally parse for logging only (error messages come back as str, not bytes)
+    if PARSE_RESPONSES and isinstance(result, bytes):
+        try:
+            result_json = orjson.loads(result)
+            logger.info("Parsed %s aspects for category %s", len(result_json.get('aspects', [])), params.category_id)
+        except Exception as e:
+            logger.warning("Failed to parse item aspects: %s", e)
+    return result
+
+
+def _bulk_result_to_json(results: dict) -> str:
+    """Combines per-key results into one JSON object.
+
+    Successful eBay responses (bytes) are embedded as-is (without re-parsing) when they look like a JSON object or array;
+    anything else (e.g. an HTML error page) and error messages are kept as strings, so the combined result stays valid JSON.
+    """
+    return orjson.dumps({
+        key: orjson.Fragment(result) if isinstance(result, bytes) and result.lstrip()[:1] in (b"{", b"[") else decode_api_result(result)
+        for key, result in results.items()
+    }).decode()
+
+
 @taxonomy_mcp.tool()
 async def get_category_suggestions(query: str) -> str:
     """Get category suggestions from eBay Taxonomy API for the UK catalogue."""
-    logger.info(f"Executing get_category_suggestions MCP tool with query='{query}'.")
-    
+    logger.info("Executing get_category_suggestions MCP tool with query='%s'.", query)
+
     try:
         # Validate and coerce params using shared model
-        params = CategorySuggestionsParams(query=query)
-        
-        async def _api_call(access_token: str, client: httpx.AsyncClient):
-            # Use standardized eBay API headers
-            headers = get_standard_ebay_headers(access_token)
-            api_params = {"q": params.query}
-            url = "https://api.ebay.com/commerce/taxonomy/v1/category_tree/3/get_category_suggestions"
-            logger.debug(f"get_category_suggestions: Requesting URL: {url} with params: {api_params} using token {access_token[:10]}...")
-            
-            response = await client.get(url, headers=headers, params=api_params)
-            logger.debug(f"get_category_suggestions: Response status: {response.status_code}")
-            response.raise_for_status()
-            logger.info("get_category_suggestions: Successfully fetched category suggestions.")
-            return response.text
-        
-        # Use the enhanced debug client
-        async with create_debug_client() as client:
-            result = await execute_ebay_api_call("get_category_suggestions", client, _api_call)
-            
-            # Optionally parse for logging only
-            result_json = json.loads(result)
-            logger.info(f"Parsed {len(result_json.get('categorySuggestions', []))} category suggestions")
-            return result
+        params = build_params(CategorySuggestionsParams, query=query)
+
+        # Reuse the shared HTTP client
+        client = get_http_client()
+        return decode_api_result(await _fetch_category_suggestions(params, client))
+    except Exception as e:
+        logger.error("Error in get_category_suggestions: %s", e)
+        return f"Error in category suggestion parameters: {str(e)}"
+
+@taxonomy_mcp.tool()
+async def get_category_suggestions_bulk(queries: Annotated[List[str], Field(max_length=BULK_MAX_ITEMS)]) -> str:
+    """Get category suggestions from eBay Taxonomy API for several queries at once.
+
+    Args:
+        queries: The query strings to find category suggestions for (at most 50).
+
+    Returns a JSON object keyed by query, each value being the same response as get_category_suggestions.
+    """
+    logger.info("Executing get_category_suggestions_bulk MCP tool with %s queries.", len(queries))
+
+    try:
+        # Validate every query up front; duplicates are only fetched once
+        params_list = [build_params(CategorySuggestionsParams, query=query) for query in dict.fromkeys(queries)]
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+        client = get_http_client()
+
+        async def _fetch_one(params: CategorySuggestionsParams):
+            async with semaphore:
+                return params.query, await _fetch_category_suggestions(params, client)
+
+        results = await asyncio.gather(*(_fetch_one(params) for params in params_list))
+        return _bulk_result_to_json(dict(results))
     except Exception as e:
-        logger.error(f"Error in get_category_suggestions: {str(e)}")
+        logger.error("Error in get_category_suggestions_bulk: %s", e)
         return f"Error in category suggestion parameters: {str(e)}"
 
 @taxonomy_mcp.tool()
 async def get_item_aspects_for_category(category_id: str) -> str:
     """Get item aspects for a specific category from eBay Taxonomy API.
-    
+
     Args:
         category_id: The eBay category ID to get aspects for.
     """
-    logger.info(f"Executing get_item_aspects_for_category MCP tool with category_id='{category_id}'.")
-    
+    logger.info("Executing get_item_aspects_for_category MCP tool with category_id='%s'.", category_id)
+
+    try:
+        params = build_params(ItemAspectsParams, category_id=category_id)
+
+        # Reuse the shared HTTP client
+        client = get_http_client()
+        return decode_api_result(await _fetch_item_aspects(params, client))
+    except Exception as e:
+        logger.error("Error in get_item_aspects_for_category: %s", e)
+        return f"Error in item aspects parameters: {str(e)}"
+
+@taxonomy_mcp.tool()
+async def get_item_aspects_for_categories(category_ids: Annotated[List[str], Field(max_length=BULK_MAX_ITEMS)]) -> str:
+    """Get item aspects for several categories at once from eBay Taxonomy API.
+
+    Args:
+        category_ids: The eBay category IDs to get aspects for (at most 50).
+
+    Returns a JSON object keyed by category ID, each value being the same response as get_item_aspects_for_category.
+    """
+    logger.info("Executing get_item_aspects_for_categories MCP tool with %s category IDs.", len(category_ids))
+
     try:
-        params = ItemAspectsParams(category_id=category_id)
-        
-        async def _api_call(access_token: str, client: httpx.AsyncClient):
-            # Use standardized eBay API headers
-            headers = get_standard_ebay_headers(access_token)
-            url = f"https://api.ebay.com/commerce/taxonomy/v1/category_tree/3/get_item_aspects_for_category"
-            logger.debug(f"get_item_aspects_for_category: Requesting URL: {url} with category_id: {params.category_id} using token {access_token[:10]}...")
-            
-            response = await client.get(url, headers=headers, params={"category_id": params.category_id})
-            logger.debug(f"get_item_aspects_for_category: Response status: {response.status_code}")
-            response.raise_for_status()
-            logger.info("get_item_aspects_for_category: Successfully fetched item aspects.")
-            return response.text
-        
-        # Use the enhanced debug client
-        async with create_debug_client() as client:
-            result = await execute_ebay_api_call("get_item_aspects_for_category", client, _api_call)
-            
-            result_json = json.loads(result)
-            logger.info(f"Parsed {len(result_json.get('aspects', []))} aspects for category {params.category_id}")
-            return result
+        # Validate every category ID up front; duplicates are only fetched once
+        params_list = [build_params(ItemAspectsParams, category_id=category_id) for category_id in dict.fromkeys(category_ids)]
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+        client = get_http_client()
+
+        async def _fetch_one(params: ItemAspectsParams):
+            async with semaphore:
+                return params.category_id, await _fetch_item_aspects(params, client)
+
+        results = await asyncio.gather(*(_fetch_one(params) for params in params_list))
+        return _bulk_result_to_json(dict(results))
     except Exception as e:
-        logger.error(f"Error in get_item_aspects_for_category: {str(e)}")
+        logger.error("Error in get_item_aspects_for_categories: %s", e)
         return f"Error in item aspects parameters: {str(e)}"
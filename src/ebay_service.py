@@ -28,12 +28,12 @@ logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file in the project root
 dotenv_path = os.path.join(project_root, '.env')
-logger.info(f"Attempting to load .env from: {dotenv_path}")
+logger.info("Attempting to load .env from: %s", dotenv_path)
 if os.path.exists(dotenv_path):
     load_dotenv(dotenv_path)
     logger.info(".env file loaded successfully.")
 else:
-    logger.warning(f".env file not found at {dotenv_path}. Environment variables might not be set.")
+    logger.warning(".env file not found at %s. Environment variables might not be set.", dotenv_path)
 
 
 async def get_ebay_access_token() -> str:
@@ -51,7 +51,7 @@ async def get_ebay_access_token() -> str:
     
     if auth_config.user_access_token:
         logger.info("Successfully retrieved EBAY_USER_ACCESS_TOKEN.")
-        logger.debug(f"get_ebay_access_token: EBAY_USER_ACCESS_TOKEN (first 10 chars): {auth_config.user_access_token[:10]}...")
+        logger.debug("get_ebay_access_token: EBAY_USER_ACCESS_TOKEN (first 10 chars): %s...", auth_config.user_access_token[:10])
         return auth_config.user_access_token
     else:
         error_msg = ("The user's EBAY_USER_ACCESS_TOKEN was not found. The user needs to authenticate with eBay before they can use this MCP. "
@@ -61,6 +61,22 @@ async def get_ebay_access_token() -> str:
         return error_msg
 
 
+def get_ebay_access_token_expiry() -> Optional[float]:
+    """
+    Returns the recorded expiry time of the current eBay User Access Token.
+    The value is written to the .env by the ebay_auth module whenever a token is issued or refreshed.
+    
+    Returns:
+        Optional[float]: Seconds since the epoch, or None if the expiry is unknown.
+    """
+    try:
+        # The .env has already been loaded by get_ebay_access_token, so read the environment as-is
+        return EbayAuthConfig.from_env().user_access_token_expires_at
+    except Exception as e:
+        logger.warning("Could not read EBAY_USER_ACCESS_TOKEN_EXPIRES_AT: %s", e)
+        return None
+
+
 async def get_auth_config() -> EbayAuthConfig:
     """
     Get the eBay authentication configuration from the environment.
@@ -3,12 +3,15 @@ Main MCP Server - Dynamically mounts all sub-servers
 """
 import os
 import sys
+import atexit
 import logging
 import logging.handlers
+import queue
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # --- Centralized Logging Configuration --- 
 from dotenv import load_dotenv
@@ -17,9 +20,27 @@ import datetime
 # Load environment variables from .env file
 load_dotenv()
 
-LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+# Log directory can be pointed at local/tmpfs storage with FASTMCP_LOG_DIR
+LOG_DIR = os.getenv('FASTMCP_LOG_DIR') or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
 LOG_FILE_PATH = os.path.join(LOG_DIR, 'fastmcp_server.log')
 
+# Filesystem types where the per-record rollover check (a stat() on every emit) is expensive
+NETWORK_FS_TYPES = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', '9p', 'fuse.sshfs', 'afs', 'glusterfs', 'ceph'}
+
+def get_filesystem_type(path):
+    """Returns the filesystem type of the mount containing path (Linux only), or None if unknown."""
+    try:
+        with open('/proc/mounts') as mounts:
+            entries = [line.split()[1:3] for line in mounts]
+    except OSError:
+        return None
+    path = os.path.realpath(path)
+    best_mount, best_type = '', None
+    for mount_point, fs_type in entries:
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best_mount):
+            best_mount, best_type = mount_point, fs_type
+    return best_type
+
 # Ensure log directory exists
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
@@ -83,17 +104,31 @@ console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
 console_handler.setLevel(log_level)
 
-# Add handlers to the root logger
-root_logger.addHandler(file_handler)
-root_logger.addHandler(console_handler)
+# Route records through a queue so the event loop never blocks on log file writes or rotation.
+# The listener thread owns the real handlers and writes the records in the background.
+log_queue = queue.SimpleQueue()
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setLevel(log_level)
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Add the queue handler to the root logger
+root_logger.addHandler(queue_handler)
 
 # Create a module-specific logger
 logger = logging.getLogger(__name__)
-logger.info(f"Logging configured with level {log_level_str} ({logging.getLevelName(log_level)})")
-logger.info(f"Log file location: {LOG_FILE_PATH}")
+logger.info("Logging configured with level %s (%s)", log_level_str, logging.getLevelName(log_level))
+logger.info("Log file location: %s", LOG_FILE_PATH)
+log_fs_type = get_filesystem_type(LOG_DIR)
+if log_fs_type in NETWORK_FS_TYPES:
+    logger.warning("Log directory %s is on a network filesystem (%s). "
+                   "Log rotation checks will be slow; set FASTMCP_LOG_DIR to local or tmpfs storage.", LOG_DIR, log_fs_type)
 # --- End of Centralized Logging Configuration ---
 
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
+from utils.debug_httpx import close_http_client
 
 # Import all sub-servers
 from ebay_mcp.auth.server import auth_mcp
@@ -123,13 +158,24 @@ KEY CONCEPTS:
 CATEGORY & ASPECTS:
 • Use 'Get Category Suggestions' to find appropriate categories
 • Use 'Get Aspects for Category' to get required/recommended item attributes
+• Use the bulk variants when resolving several queries or categories at once
 
 WORKFLOW FLEXIBILITY:
 While the primary workflow above is typical, you can use inventoryAPI_manage_inventory_item and inventoryAPI_manage_offer tools independently to GET, MODIFY, or DELETE existing items and WITHDRAW offers as needed."""
 
+@asynccontextmanager
+async def lifespan(server):
+    """Closes the shared HTTP client when the server shuts down"""
+    try:
+        yield
+    finally:
+        await close_http_client()
+        logger.info("Closed shared HTTP client")
+
 mcp = FastMCP(
     name="eBay API",
-    instructions=instruction_text
+    instructions=instruction_text,
+    lifespan=lifespan
 )
 
 # Mount sub-servers
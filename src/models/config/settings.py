@@ -7,6 +7,15 @@ from pydantic import BaseModel, Field, validator
 import os
 from dotenv import load_dotenv
 
+def _parse_expiry(value: Optional[str]) -> Optional[float]:
+    """Parses a seconds-since-the-epoch expiry from the environment. Empty or malformed values mean the expiry is unknown."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
 class EbayAuthConfig(BaseModel):
     """eBay authentication configuration."""
     
@@ -17,6 +26,7 @@ class EbayAuthConfig(BaseModel):
     
     # User authentication tokens
     user_access_token: Optional[str] = Field(None, description="eBay User Access Token")
+    user_access_token_expires_at: Optional[float] = Field(None, description="Expiry time of the User Access Token (seconds since the epoch)")
     user_refresh_token: Optional[str] = Field(None, description="eBay User Refresh Token")
     user_id: Optional[str] = Field(None, description="eBay User ID")
     user_name: Optional[str] = Field(None, description="eBay User Name")
@@ -33,6 +43,7 @@ class EbayAuthConfig(BaseModel):
             ru_name=os.getenv("EBAY_RU_NAME", ""),
             redirect_uri=os.getenv("EBAY_APP_CONFIGURED_REDIRECT_URI", ""),
             user_access_token=os.getenv("EBAY_USER_ACCESS_TOKEN"),
+            user_access_token_expires_at=_parse_expiry(os.getenv("EBAY_USER_ACCESS_TOKEN_EXPIRES_AT")),
             user_refresh_token=os.getenv("EBAY_USER_REFRESH_TOKEN"),
             user_id=os.getenv("EBAY_USER_ID"),
             user_name=os.getenv("EBAY_USER_NAME")
@@ -174,6 +174,7 @@ class ManageOfferResponseDetails(EbayBaseModel):
     status_code: Optional[int] = Field(None, alias="statusCode")
     message: str
     details: Optional[Any] = None # To store raw response from eBay if needed
+    skipped: bool = False # True when no write was sent because the offer already matched the request
 
     class Config:
         populate_by_name = True
@@ -2,12 +2,14 @@
 Models for MCP tool parameters and responses.
 """
 from typing import Any, Dict, List, Optional, Union
-from pydantic import Field, field_validator
+from pydantic import ConfigDict, Field, field_validator
 from .base import EbayBaseModel, EbayResponse
 
 
 class SearchEbayItemsParams(EbayBaseModel):
     """Parameters for the search_ebay_items tool."""
+
+    model_config = ConfigDict(frozen=True)
     
     query: str = Field(..., description="The search query string.")
     limit: int = Field(10, description="The maximum number of items to return.")
@@ -22,6 +24,8 @@ class SearchEbayItemsParams(EbayBaseModel):
 
 class CategorySuggestionsParams(EbayBaseModel):
     """Parameters for the get_category_suggestions tool."""
+
+    model_config = ConfigDict(frozen=True)
     
     query: str = Field(..., description="The query string to find category suggestions for.")
     
@@ -37,6 +41,8 @@ class CategorySuggestionsParams(EbayBaseModel):
 class ItemAspectsParams(EbayBaseModel):
     """
 Parameters for the get_item_aspects_for_category tool."""
+
+    model_config = ConfigDict(frozen=True)
     
     category_id: str = Field(..., description="The eBay category ID to get aspects for.")
     
@@ -113,6 +119,8 @@ class TriggerEbayLoginResponse(EbayResponse[str]):
 
 class GetInventoryItemsParams(EbayBaseModel):
     """Parameters for the get_inventory_items tool."""
+
+    model_config = ConfigDict(frozen=True)
     
     limit: int = Field(25, description="The maximum number of inventory items to return per page (1-200).")
     offset: int = Field(0, description="The number of inventory items to skip before starting to return results.")
@@ -3,19 +3,22 @@ Shared API utilities for eBay API calls
 """
 import logging
 import asyncio
+import concurrent.futures
 import httpx
 import os
 import sys
-import json
+import time
+from typing import Optional, Union
 from dotenv import load_dotenv
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Import authentication functions
 from ebay_auth.ebay_auth import refresh_access_token as ebay_auth_refresh_token
-from ebay_service import get_ebay_access_token
+from ebay_service import get_ebay_access_token, get_ebay_access_token_expiry
 
 # Load environment variables
 load_dotenv()
@@ -26,53 +29,152 @@ logger = logging.getLogger(__name__)
 # Determine if we're in DEBUG mode
 DEBUG_MODE = os.getenv('MCP_LOG_LEVEL', 'NORMAL').upper() == 'DEBUG'
 
+# Tools return the raw eBay response text, so parsing it is only useful for summary logging.
+# Disabled by default to avoid a full JSON parse on every successful call.
+PARSE_RESPONSES = os.getenv('EBAY_PARSE_RESPONSES', '0') == '1'
+
+# MCP already type-checks tool arguments against the tool signature. When enabled, tool param models
+# are built with model_construct and their range/emptiness validators are skipped. Disabled by default.
+TRUST_MCP_INPUTS = os.getenv('EBAY_TRUST_MCP_INPUTS', '0') == '1'
+
+# Common prefixes for error messages returned by get_ebay_access_token
+_ERROR_PREFIXES = (
+    "Failed to get access token",
+    "EBAY_CLIENT_ID or EBAY_CLIENT_SECRET is not set",
+    "No access_token found in eBay response",
+    "HTTPX RequestError occurred",
+    "An unexpected error occurred",
+    "EBAY_USER_ACCESS_TOKEN not found", # Added from ebay_service update
+    "The user's EBAY_USER_ACCESS_TOKEN was not found", # Current get_ebay_access_token wording
+)
+
+def decode_api_result(result: Union[bytes, str]) -> str:
+    """Returns an execute_ebay_api_call result as text. Read-only tools return raw response bytes; error messages are already str."""
+    return result.decode('utf-8') if isinstance(result, bytes) else result
+
+def build_params(model_cls, **kwargs):
+    """Builds a tool params model, skipping Pydantic validation when TRUST_MCP_INPUTS is enabled."""
+    if TRUST_MCP_INPUTS:
+        return model_cls.model_construct(**kwargs)
+    return model_cls(**kwargs)
+
 # Helper to check if token is an error message from our get_ebay_access_token function
 def is_token_error(token: str) -> bool:
     """Checks if the token string is actually an error message from get_ebay_access_token."""
     if not token: # Handles empty string or None
         logger.warning("is_token_error received an empty or None token.")
         return True # Treat as error
-    # Common prefixes for error messages returned by get_ebay_access_token
-    error_prefixes = [
-        "Failed to get access token", 
-        "EBAY_CLIENT_ID or EBAY_CLIENT_SECRET is not set",
-        "No access_token found in eBay response",
-        "HTTPX RequestError occurred",
-        "An unexpected error occurred",
-        "EBAY_USER_ACCESS_TOKEN not found" # Added from ebay_service update
-    ]
-    return any(token.startswith(prefix) for prefix in error_prefixes)
-
-def log_request_response_debug(request=None, response=None, error=None, prefix=''):
-    """Log detailed request and response information when in DEBUG mode"""
-    if not DEBUG_MODE:
-        return
-        
-    if request:
-        try:
-            request_info = {
-                'method': request.method,
-                'url': str(request.url),
-                'headers': dict(request.headers),
-                'content': request.content.decode('utf-8') if request.content else None
-            }
-            logger.debug(f"{prefix} Request: {json.dumps(request_info, indent=2)}")
-        except Exception as e:
-            logger.debug(f"{prefix} Failed to log request details: {e}")
-    
-    if response:
-        try:
-            response_info = {
-                'status_code': response.status_code,
-                'headers': dict(response.headers),
-                'content': response.text if hasattr(response, 'text') else None
-            }
-            logger.debug(f"{prefix} Response: {json.dumps(response_info, indent=2)}")
-        except Exception as e:
-            logger.debug(f"{prefix} Failed to log response details: {e}")
-    
-    if error:
-        logger.debug(f"{prefix} Error: {error}")
+    return token.startswith(_ERROR_PREFIXES)
+
+# --- Access Token Cache ---
+# get_ebay_access_token re-reads the .env file on every call. Keep the token in memory between
+# tool calls and only go back to the .env when the cached value is near expiry or a 401 forces a refresh.
+TOKEN_CACHE_TTL_SECONDS = 3500  # Conservative default, well under eBay's 2 hour user token lifetime
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+_token_cache = {"value": None, "expires_at": 0.0}
+_token_lock = asyncio.Lock()
+
+def _cached_token_is_fresh() -> bool:
+    """Checks if the cached token exists and is not within the expiry margin."""
+    return bool(_token_cache["value"]) and time.monotonic() < _token_cache["expires_at"] - TOKEN_EXPIRY_MARGIN_SECONDS
+
+def _cached_token_expires_soon() -> bool:
+    """Checks if the cached token is within the expiry margin and should be refreshed before use."""
+    return bool(_token_cache["value"]) and _token_cache["expires_at"] - time.monotonic() < TOKEN_EXPIRY_MARGIN_SECONDS
+
+def invalidate_cached_token() -> None:
+    """Drops the cached access token so the next call re-reads it from the .env file."""
+    _token_cache["value"] = None
+    _token_cache["expires_at"] = 0.0
+
+async def get_cached_access_token(force: bool = False) -> str:
+    """
+    Returns the eBay access token, reading it from the .env file only when the cache is stale.
+
+    Args:
+        force: Bypass the cache and reload the token (e.g. after a refresh).
+    Returns:
+        The access token, or the error message from get_ebay_access_token.
+    """
+    if not force and _cached_token_is_fresh():
+        return _token_cache["value"]
+
+    async with _token_lock:
+        # Another task may have reloaded the token while we were waiting for the lock
+        if not force and _cached_token_is_fresh():
+            return _token_cache["value"]
+
+        access_token = await get_ebay_access_token()
+        if is_token_error(access_token):
+            invalidate_cached_token()
+        else:
+            _token_cache["value"] = access_token
+            # Use the recorded token expiry when available so the token can be refreshed proactively
+            token_expires_at = get_ebay_access_token_expiry()
+            if token_expires_at:
+                _token_cache["expires_at"] = time.monotonic() + (token_expires_at - time.time())
+            else:
+                _token_cache["expires_at"] = time.monotonic() + TOKEN_CACHE_TTL_SECONDS
+        return access_token
+
+# Refreshes run one at a time on a dedicated thread: concurrent 401s must not each rotate the
+# refresh token, and a slow refresh should not tie up the event loop's default executor.
+# Requests that hit a 401 while a refresh is in flight all await that same refresh task.
+_refresh_lock = asyncio.Lock()
+_refresh_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="ebay-refresh")
+_refresh_task: Optional[asyncio.Task] = None
+
+# After a failed proactive refresh (e.g. a revoked refresh token), stop refreshing before every call for a while.
+# A 401 still triggers a refresh, so a recovered token is picked up without waiting for the backoff to end.
+PROACTIVE_REFRESH_BACKOFF_SECONDS = 300
+_proactive_refresh_retry_at = 0.0
+
+async def _run_token_refresh() -> Optional[str]:
+    """Runs the blocking ebay_auth refresh on the refresh thread, then reloads the token into the cache."""
+    loop = asyncio.get_running_loop()
+    new_token_value_after_refresh = await loop.run_in_executor(_refresh_executor, ebay_auth_refresh_token)
+    if not new_token_value_after_refresh:
+        return None
+    logger.info("Token refresh process completed. New token value: %s...", new_token_value_after_refresh[:10])
+    return await get_cached_access_token(force=True) # This should now pick up the new token from .env
+
+async def refresh_cached_token(stale_token: str) -> Optional[str]:
+    """
+    Refreshes the eBay access token via the ebay_auth module and reloads it into the cache.
+
+    Concurrent callers share a single in-flight refresh.
+
+    Args:
+        stale_token: The token found to be expired. If another task has already replaced it,
+                     the newer token is returned without refreshing again.
+    Returns:
+        The new access token (or get_ebay_access_token's error message), or None if the refresh failed.
+    """
+    global _refresh_task
+    async with _refresh_lock:
+        if _token_cache["value"] and _token_cache["value"] != stale_token:
+            logger.info("Access token was already refreshed by another request. Reusing it.")
+            return _token_cache["value"]
+
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = asyncio.create_task(_run_token_refresh())
+        else:
+            logger.info("Token refresh already in progress. Waiting for it.")
+        refresh_task = _refresh_task
+
+    # Shield so a cancelled tool call does not abort the refresh other callers are waiting on
+    return await asyncio.shield(refresh_task)
+# --- End Access Token Cache ---
+
+# Static part of the standard eBay API headers, built once at import time
+_STATIC_EBAY_HEADERS = {
+    "Content-Type": "application/json",
+    "Content-Language": "en-GB",  # Required for ALL eBay API requests (hyphen format)
+    "Accept-Language": "en-GB",   # Required for ALL eBay API requests (hyphen format)
+}
+
+# Extra header for lookups that must get a JSON response; pass as additional_headers
+ACCEPT_JSON_HEADERS = {"Accept": "application/json"}
 
 def get_standard_ebay_headers(access_token: str, additional_headers: dict = None) -> dict:
     """
@@ -93,17 +195,10 @@ def get_standard_ebay_headers(access_token: str, additional_headers: dict = None
     Returns:
         Dictionary of standardized headers
     """
-    standard_headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "Content-Language": "en-GB",  # Required for ALL eBay API requests (hyphen format)
-        "Accept-Language": "en-GB",   # Required for ALL eBay API requests (hyphen format)
-    }
-
+    # Only the bearer token varies per call; callers may mutate the returned dict
     if additional_headers:
-        standard_headers.update(additional_headers)
-
-    return standard_headers
+        return {"Authorization": f"Bearer {access_token}", **_STATIC_EBAY_HEADERS, **additional_headers}
+    return {"Authorization": f"Bearer {access_token}", **_STATIC_EBAY_HEADERS}
 
 async def execute_ebay_api_call(tool_name: str, client: httpx.AsyncClient, api_call_logic: callable):
     """
@@ -119,63 +214,48 @@ async def execute_ebay_api_call(tool_name: str, client: httpx.AsyncClient, api_c
         tool_name: Name of the MCP tool making the call (for logging).
         client: The httpx.AsyncClient instance.
         api_call_logic: An async callable that takes an access_token and the client,
-                        and performs the actual API request. It should return the response text
+                        and performs the actual API request. It should return its result
+                        (raw response bytes for read-only tools, a JSON str for the inventory tools)
                         or raise httpx.HTTPStatusError on API errors.
     Returns:
-        The API response text on success, or an error message string on failure.
+        Whatever api_call_logic returned on success, or an error message str on failure.
+        Read-only tools return the raw response bytes, so a str result means an error;
+        they tell the two apart with isinstance and decode success bytes via decode_api_result.
     """
-    access_token = await get_ebay_access_token()
+    access_token = await get_cached_access_token()
     if is_token_error(access_token):
-        logger.error(f"{tool_name}: Initial token acquisition failed: {access_token}")
+        logger.error("%s: Initial token acquisition failed: %s", tool_name, access_token)
         return f"Token acquisition failed. Details: {access_token}"
 
+    # Refresh before the call when the token is known to be about to expire, rather than
+    # paying for a request that is bound to fail with 401. The 401 handling below remains as a safety net.
+    global _proactive_refresh_retry_at
+    if _cached_token_expires_soon() and time.monotonic() >= _proactive_refresh_retry_at:
+        logger.info("%s: Access token %s... expires within %ss. Refreshing before the API call.", tool_name, access_token[:10], TOKEN_EXPIRY_MARGIN_SECONDS)
+        refreshed_access_token = await refresh_cached_token(access_token)
+        if refreshed_access_token and not is_token_error(refreshed_access_token):
+            access_token = refreshed_access_token
+        else:
+            _proactive_refresh_retry_at = time.monotonic() + PROACTIVE_REFRESH_BACKOFF_SECONDS
+            logger.warning("%s: Proactive token refresh failed. Attempting API call with the current token; "
+                           "not refreshing proactively again for %ss.", tool_name, PROACTIVE_REFRESH_BACKOFF_SECONDS)
+
     try:
-        logger.info(f"{tool_name}: Attempting API call with current token: {access_token[:10]}...")
+        logger.info("%s: Attempting API call with current token: %s...", tool_name, access_token[:10])
         if DEBUG_MODE:
-            logger.debug(f"{tool_name}: Executing API call with full token: {access_token}")
+            logger.debug("%s: Executing API call with full token: %s", tool_name, access_token)
         
-        # Wrap the api_call_logic to intercept and log requests/responses
-        async def wrapped_api_call(token, client):
-            response_text = None
-            response_obj = None
-            request_obj = None
-            
-            try:
-                # Call the original API logic and capture the response
-                response_text = await api_call_logic(token, client)
-                
-                # If we're in DEBUG mode and the response isn't an error message,
-                # log the request and response details (this can be extended based on the actual implementation)
-                if DEBUG_MODE and hasattr(client, '_last_request') and hasattr(client, '_last_response'):
-                    request_obj = getattr(client, '_last_request', None)
-                    response_obj = getattr(client, '_last_response', None)
-                    log_request_response_debug(request_obj, response_obj, prefix=f"{tool_name}")
-                
-                return response_text
-            except Exception as e:
-                if DEBUG_MODE:
-                    logger.debug(f"{tool_name}: Exception in API call: {e}")
-                    if hasattr(e, 'request'):
-                        log_request_response_debug(request=e.request, prefix=f"{tool_name}")
-                    if hasattr(e, 'response'):
-                        log_request_response_debug(response=e.response, prefix=f"{tool_name}")
-                raise
-                
-        return await wrapped_api_call(access_token, client)
+        # In DEBUG mode, requests and responses are logged by the client's event hooks (see utils.debug_httpx)
+        return await api_call_logic(access_token, client)
     except httpx.HTTPStatusError as e:
-        if DEBUG_MODE:
-            log_request_response_debug(request=e.request, response=e.response, 
-                                      error=f"HTTP Status Error: {e}", prefix=f"{tool_name}")
+        # The failed request and response were already logged by the client's event hooks in DEBUG mode
+        logger.debug("%s: HTTP Status Error: %s", tool_name, e)
         if e.response.status_code == 401:
-            logger.warning(f"{tool_name}: API call failed with 401 (Unauthorized). Token {access_token[:10]}... may be expired. Attempting refresh.")
+            logger.warning("%s: API call failed with 401 (Unauthorized). Token %s... may be expired. Attempting refresh.", tool_name, access_token[:10])
             
-            loop = asyncio.get_event_loop()
-            new_token_value_after_refresh = await loop.run_in_executor(None, ebay_auth_refresh_token)
+            refreshed_access_token = await refresh_cached_token(access_token)
 
-            if new_token_value_after_refresh:
-                logger.info(f"{tool_name}: Token refresh process completed. New token value: {new_token_value_after_refresh[:10]}... Attempting to retrieve and retry API call.")
-                refreshed_access_token = await get_ebay_access_token() # This should now pick up the new token from .env
-                
+            if refreshed_access_token:
                 if is_token_error(refreshed_access_token):
                     error_msg = (f"{tool_name}: Failed to retrieve token from .env after refresh attempt. "
                                  f"The user needs to authenticate with eBay again. You can use the 'trigger_ebay_login' tool to help the user login. "
@@ -183,7 +263,7 @@ async def execute_ebay_api_call(tool_name: str, client: httpx.AsyncClient, api_c
                     logger.error(error_msg)
                     return error_msg
                 
-                logger.info(f"{tool_name}: Retrying API call with refreshed token: {refreshed_access_token[:10]}...")
+                logger.info("%s: Retrying API call with refreshed token: %s...", tool_name, refreshed_access_token[:10])
                 try:
                     return await api_call_logic(refreshed_access_token, client)
                 except httpx.HTTPStatusError as retry_e:
@@ -1,10 +1,11 @@
 """
 Enhanced HTTPX client with debug capabilities for MCP server.
-This module provides request and response tracking to enable detailed debugging.
+This module provides request and response logging hooks to enable detailed debugging.
 """
 import httpx
+import importlib.util
 import logging
-from typing import Any, Dict, Optional, Union
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -17,69 +18,70 @@ logger = logging.getLogger(__name__)
 # Determine if we're in DEBUG mode
 DEBUG_MODE = os.getenv('MCP_LOG_LEVEL', 'NORMAL').upper() == 'DEBUG'
 
-class DebugAsyncClient(httpx.AsyncClient):
-    """
-    Enhanced AsyncClient that tracks the last request and response for debugging purposes.
-    """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._last_request = None
-        self._last_response = None
-        
-    async def request(self, method, url, **kwargs) -> httpx.Response:
-        """Override the request method to track requests and responses."""
-        # Execute the request first
-        response = await super().request(method, url, **kwargs)
-        
-        # Store the request and response
-        self._last_request = response.request
-        self._last_response = response
-        
-        return response
-        
-    async def get(self, *args, **kwargs) -> httpx.Response:
-        """Override the get method for convenience."""
-        response = await super().get(*args, **kwargs)
-        self._last_request = response.request
-        self._last_response = response
-        return response
-        
-    async def post(self, *args, **kwargs) -> httpx.Response:
-        """Override the post method for convenience."""
-        response = await super().post(*args, **kwargs)
-        self._last_request = response.request
-        self._last_response = response
-        return response
-        
-    async def put(self, *args, **kwargs) -> httpx.Response:
-        """Override the put method for convenience."""
-        response = await super().put(*args, **kwargs)
-        self._last_request = response.request
-        self._last_response = response
-        return response
-        
-    async def delete(self, *args, **kwargs) -> httpx.Response:
-        """Override the delete method for convenience."""
-        response = await super().delete(*args, **kwargs)
-        self._last_request = response.request
-        self._last_response = response
-        return response
-        
-    async def patch(self, *args, **kwargs) -> httpx.Response:
-        """Override the patch method for convenience."""
-        response = await super().patch(*args, **kwargs)
-        self._last_request = response.request
-        self._last_response = response
-        return response
-        
-def create_debug_client(*args, **kwargs) -> Union[DebugAsyncClient, httpx.AsyncClient]:
+# Connection pool settings for the shared client used by all MCP tools
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+# api.ebay.com supports HTTP/2; use it when the h2 package (httpx[http2]) is installed
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# Shared client, created on first use so it binds to the server's running event loop
+_http_client: Optional[httpx.AsyncClient] = None
+
+async def _log_request(request: httpx.Request) -> None:
+    """Event hook that logs each outgoing request."""
+    try:
+        logger.debug(
+            "HTTP Request: %s %s headers=%s content=%s",
+            request.method,
+            request.url,
+            dict(request.headers),
+            request.content.decode('utf-8') if request.content else None,
+        )
+    except Exception as e:
+        logger.debug("Failed to log request details: %s", e)
+
+async def _log_response(response: httpx.Response) -> None:
+    """Event hook that logs each response. Reads the body so it can be logged; streamed reads still work afterwards."""
+    try:
+        await response.aread()
+        logger.debug(
+            "HTTP Response: %s %s -> %s headers=%s content=%s",
+            response.request.method,
+            response.request.url,
+            response.status_code,
+            dict(response.headers),
+            response.text,
+        )
+    except Exception as e:
+        logger.debug("Failed to log response details: %s", e)
+
+def create_debug_client(*args, **kwargs) -> httpx.AsyncClient:
     """
-    Creates either a DebugAsyncClient or a standard httpx.AsyncClient based on the DEBUG_MODE setting.
+    Creates an httpx.AsyncClient, adding request/response logging event hooks when DEBUG_MODE is set.
     
     Returns:
-        Either a DebugAsyncClient (if DEBUG_MODE=True) or standard httpx.AsyncClient
+        An httpx.AsyncClient (with debug event hooks if DEBUG_MODE=True)
     """
     if DEBUG_MODE:
-        return DebugAsyncClient(*args, **kwargs)
-    else:
-        return httpx.AsyncClient(*args, **kwargs)
+        kwargs.setdefault('event_hooks', {'request': [_log_request], 'response': [_log_response]})
+    return httpx.AsyncClient(*args, **kwargs)
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared HTTP client, creating it on first use.
+
+    Reusing one client keeps connections to api.ebay.com alive between tool calls, avoiding a
+    new TCP and TLS handshake per call. Callers must not close it; use close_http_client() at shutdown.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_debug_client(http2=HTTP2_ENABLED, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    return _http_client
+
+async def close_http_client() -> None:
+    """Closes the shared HTTP client, if one was created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
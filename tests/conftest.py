@@ -0,0 +1,87 @@
+import asyncio
+import atexit
+import logging
+import os
+import re
+
+import pytest
+import pytest_asyncio
+
+# Upper bound on tool calls per session, so a misbehaving run cannot burn the eBay daily quota
+EBAY_TEST_CALL_BUDGET = int(os.getenv('EBAY_TEST_CALL_BUDGET', '30'))
+# Error text the tools return for an HTTP 429: the inventory tools' "eBay API Error (429)" and execute_ebay_api_call's "status code 429"
+RATE_LIMIT_RE = re.compile(r"eBay API Error \(429\)|status code 429\b")
+
+try:
+    import uvloop  # Optional: faster event loop when installed
+except ImportError:
+    uvloop = None
+
+
+# --- Fixtures ---
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Runs the async tests on uvloop when it is installed"""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def mcp_server():
+    """The main FastMCP server, imported in-process.
+
+    A sync fixture, because the inventory server registers its tools with loop.run_until_complete at import time,
+    which fails inside the already running loop of an async fixture.
+    """
+    # Imported here so collection (--collect-only, -k filters) does not pay for the whole server
+    # main_server configures logging for the server process on import: it replaces the root handlers, lowers the
+    # root level to DEBUG and starts a queue listener writing to logs/. Undo that so test logging stays with pytest.
+    root_logger = logging.getLogger()
+    saved_handlers, saved_level = root_logger.handlers[:], root_logger.level
+    import main_server
+    # QueueListener.stop is not idempotent on 3.12, so drop main_server's atexit call before stopping it here
+    atexit.unregister(main_server.log_listener.stop)
+    main_server.log_listener.stop()
+    main_server.file_handler.close()
+    root_logger.removeHandler(main_server.queue_handler)
+    for handler in saved_handlers:
+        root_logger.addHandler(handler)
+    root_logger.setLevel(saved_level)
+    return main_server.mcp
+
+
+@pytest_asyncio.fixture(scope="session")
+async def mcp_client(mcp_server):
+    """Session-wide MCP client connected to the server in-process (no subprocess or stdio pipe)"""
+    from fastmcp import Client
+
+    async with Client(mcp_server) as client:
+        call_tool = client.call_tool
+        calls = 0
+        abort_reason = None
+
+        def abort(reason):
+            # pytest.exit raises an Exception subclass, so a test's "except Exception" can swallow it.
+            # Remembering the reason makes every later call abort again instead of reaching eBay.
+            nonlocal abort_reason
+            abort_reason = reason
+            pytest.exit(reason, returncode=2)
+
+        async def budgeted_call_tool(*args, **kwargs):
+            nonlocal calls
+            if abort_reason:
+                pytest.exit(abort_reason, returncode=2)
+            calls += 1
+            if calls > EBAY_TEST_CALL_BUDGET:
+                abort(f"More than {EBAY_TEST_CALL_BUDGET} tool calls this session (EBAY_TEST_CALL_BUDGET)")
+            result = await call_tool(*args, **kwargs)
+            # Every further call would be rejected too once eBay's call limit is used up, so stop the whole session
+            for content in result:
+                text = getattr(content, "text", None)
+                if text and RATE_LIMIT_RE.search(text):
+                    abort(f"eBay rate limit hit calling {args[0] if args else kwargs.get('name')}: {text[:500]}")
+            return result
+
+        client.call_tool = budgeted_call_tool
+        yield client
@@ -2,6 +2,11 @@ import asyncio
 import json
 from fastmcp import Client
 
+try:
+    import uvloop  # Optional: faster event loop when installed
+except ImportError:
+    uvloop = None
+
 async def main():
     # Connect via stdio to a local script
     async with Client("src/main_server.py") as client:
@@ -31,4 +36,7 @@ async def main():
             print("Raw result:", result)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -1,7 +1,23 @@
 import asyncio
 import json
+import orjson
 from fastmcp import Client
 
+try:
+    import uvloop  # Optional: faster event loop when installed
+except ImportError:
+    uvloop = None
+
+def _loads(text):
+    """Parses a tool response with orjson."""
+    return orjson.loads(text)
+
+
+def _dumps(obj, indent=False):
+    """Serialises to JSON text with orjson, optionally indented for logging."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+
 async def main():
     # Connect via stdio to a local script
     async with Client("src/main_server.py") as client:
@@ -18,13 +34,16 @@ async def main():
         # Extract the text content and parse JSON
         try:
             # Get the first TextContent object and parse its text as JSON
-            json_data = json.loads(result[0].text)
+            json_data = _loads(result[0].text)
             # Pretty print the JSON with indentation
             print("Result:")
-            print(json.dumps(json_data, indent=2))
+            print(_dumps(json_data, indent=True))
         except (IndexError, json.JSONDecodeError) as e:
             print(f"Error formatting result: {e}")
             print("Raw result:", result)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
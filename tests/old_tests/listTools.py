@@ -1,6 +1,11 @@
 import asyncio
 from fastmcp import Client
-import json
+import orjson
+
+try:
+    import uvloop  # Optional: faster event loop when installed
+except ImportError:
+    uvloop = None
 
 async def main():
     # Connect via stdio to a local script
@@ -15,11 +20,14 @@ async def main():
             'inputSchema': tool.inputSchema
         } for tool in tools]
         
-        with open("tests/available_tools.json", "w") as f:
-            json.dump(tools_data, f, indent=2)
+        with open("tests/available_tools.json", "wb") as f:
+            f.write(orjson.dumps(tools_data, option=orjson.OPT_INDENT_2))
 
         # result = await client.call_tool("add", {"a": 5, "b": 3})
         # print(f"Result: {result.text}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -1,11 +1,21 @@
 import asyncio
+import atexit
 import json
+import orjson
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 from datetime import datetime
 from pathlib import Path
 from fastmcp import Client
 
+try:
+    import uvloop  # Optional: faster event loop when installed
+except ImportError:
+    uvloop = None
+
 # Configure logging
 log_dir = Path(__file__).parent / "test_logs"
 log_dir.mkdir(exist_ok=True)
@@ -22,42 +32,91 @@ logger.setLevel(logging.INFO)
 # Console handler
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(console_formatter)
-logger.addHandler(console_handler)
 
 # File handler
 file_handler = logging.FileHandler(log_file)
 file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
+
+# Route records through a queue so tool calls never wait on log writes;
+# the listener thread owns the real handlers.
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
 logger.info(f"Logging to file: {log_file}")
 
+def _loads(text):
+    """Parses a tool response with orjson."""
+    return orjson.loads(text)
+
+
+def _looks_like_json(text):
+    """Cheap check for a JSON object/array so plain-text errors skip the parser."""
+    return text.lstrip()[:1] in ('{', '[')
+
+
+class _LazyJson:
+    """Pretty-prints its object only when the log record is actually emitted."""
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return orjson.dumps(self.obj, option=orjson.OPT_INDENT_2).decode()
+
+
 # Test configuration
 TEST_SKU = "TT-01"  # Replace with a test SKU that exists in your inventory
 TEST_CATEGORY_ID = "39630"  # Test category ID
 
+# Offer fields applied by the modify step; includes everything publish needs
+MODIFY_OFFER_DATA = {
+    "availableQuantity": 2,
+    "pricingSummary": {
+        "price": {
+            "value": "19.99",
+            "currency": "GBP"
+        }
+    },
+    "condition": "USED_EXCELLENT",
+    "conditionDescription": "Chips around edge",
+    "categoryId": TEST_CATEGORY_ID,
+}
+
 class TestResult:
+    __slots__ = ('name', 'passed', 'error', 'details', '_str')
+
     def __init__(self, name):
         self.name = name
         self.passed = False
         self.error = None
         self.details = None
+        self._str = None
 
     def set_passed(self, details=None):
         self.passed = True
         self.error = None
         self.details = details
+        self._str = None
         return self
 
     def set_failed(self, error, details=None):
         self.passed = False
         self.error = str(error)
         self.details = details
+        self._str = None
         return self
 
     def __str__(self):
-        status = "PASSED" if self.passed else f"FAILED: {self.error}"
-        details = f"\n    Details: {self.details}" if self.details else ""
-        return f"{self.name}: {status}{details}"
+        # Each result is logged after its step and again in the summary, so format it once
+        if self._str is None:
+            status = "PASSED" if self.passed else f"FAILED: {self.error}"
+            details = f"\n    Details: {self.details}" if self.details else ""
+            self._str = f"{self.name}: {status}{details}"
+        return self._str
 
 async def manage_offer_test():
     test_results = []
@@ -85,7 +144,7 @@ async def manage_offer_test():
                 )
                 
                 try:
-                    json_data = json.loads(get_result[0].text)
+                    json_data = _loads(get_result[0].text)
                     if json_data.get('success') and 'data' in json_data and 'offer_id' in json_data['data']:
                         offer_id = json_data['data']['offer_id']
                         test_check.set_passed(f"Found existing offer with ID: {offer_id}")
@@ -133,9 +192,8 @@ async def manage_offer_test():
                     )
                     
                     try:
-                        json_data = json.loads(create_result[0].text)
-                        logger.info("Create offer result:")
-                        logger.info(json.dumps(json_data, indent=2))
+                        json_data = _loads(create_result[0].text)
+                        logger.info("Create offer result:\n%s", _LazyJson(json_data))
                         if json_data.get('success') and 'offer_id' in json_data.get('data', {}):
                             test_create.set_passed(f"Created offer with ID: {json_data['data']['offer_id']}")
                             offer_id = json_data['data']['offer_id']
@@ -180,9 +238,8 @@ async def manage_offer_test():
                 )
                 
                 try:
-                    json_data = json.loads(get_result[0].text)
-                    logger.info("Get offer result:")
-                    logger.info(json.dumps(json_data, indent=2))
+                    json_data = _loads(get_result[0].text)
+                    logger.info("Get offer result:\n%s", _LazyJson(json_data))
                     if json_data.get('success') and 'data' in json_data and json_data['data'].get('offer_id') == offer_id:
                         test_get.set_passed(f"Successfully retrieved offer {offer_id}")
                     else:
@@ -213,27 +270,17 @@ async def manage_offer_test():
                         "params": {
                             "sku": TEST_SKU,
                             "action": "modify",
-                            "offer_data": {
-                                "availableQuantity": 2,
-                                "pricingSummary": {
-                                    "price": {
-                                        "value": "19.99",
-                                        "currency": "GBP"
-                                    }
-                                },
-                                "condition": "USED_EXCELLENT"  # Add required condition field
-                            }
+                            "offer_data": MODIFY_OFFER_DATA
                         }
                     }
                 )
                 
                 # Handle the response
                 try:
-                    # First try to parse as JSON
-                    try:
-                        json_data = json.loads(modify_result[0].text)
-                        logger.info("Modify offer result (JSON):")
-                        logger.info(json.dumps(json_data, indent=2))
+                    text = modify_result[0].text
+                    if _looks_like_json(text):
+                        json_data = _loads(text)
+                        logger.info("Modify offer result (JSON):\n%s", _LazyJson(json_data))
                         
                         if json_data.get('success') and 'data' in json_data and json_data['data'].get('offer_id') == offer_id:
                             test_modify.set_passed(f"Successfully modified offer {offer_id}")
@@ -241,16 +288,15 @@ async def manage_offer_test():
                             error_msg = json_data.get('error', 'Unknown error')
                             test_modify.set_failed(f"Failed to modify offer: {error_msg}", json_data)
                             
-                    except json.JSONDecodeError:
+                    else:
                         # If not JSON, log the raw text
-                        logger.info("Modify offer result (raw text):")
-                        logger.info(modify_result[0].text)
+                        logger.info("Modify offer result (raw text):\n%s", text)
                         
                         # Check for common error patterns in the text
-                        if "error" in modify_result[0].text.lower():
-                            test_modify.set_failed(f"Modify failed with error: {modify_result[0].text}")
+                        if "error" in text.lower():
+                            test_modify.set_failed(f"Modify failed with error: {text}")
                         else:
-                            test_modify.set_failed(f"Unexpected response format: {modify_result[0].text}")
+                            test_modify.set_failed(f"Unexpected response format: {text}")
                         
                 except (IndexError, AttributeError) as e:
                     error_msg = f"Error processing modify result: {e}"
@@ -276,30 +322,7 @@ async def manage_offer_test():
             logger.info("Testing publish offer...")
             
             try:
-                # First, update the offer with required condition information
-                update_result = await client.call_tool(
-                    "inventoryAPI_manage_offer",
-                    {
-                        "params": {
-                            "sku": TEST_SKU,
-                            "action": "modify",
-                            "offer_data": {
-                                "availableQuantity": 2,
-                                "pricingSummary": {
-                                    "price": {
-                                        "value": "19.99",
-                                        "currency": "GBP"
-                                    }
-                                },
-                                "condition": "USED_EXCELLENT",
-                                "conditionDescription": "Chips around edge",
-                                "categoryId": TEST_CATEGORY_ID,
-                            }
-                        }
-                    }
-                )
-                
-                # Now try to publish the offer
+                # The modify step above already set the condition and category required to publish
                 publish_result = await client.call_tool(
                     "inventoryAPI_manage_offer",
                     {
@@ -311,11 +334,10 @@ async def manage_offer_test():
                 )
                 
                 try:
-                    # First try to parse as JSON
-                    try:
-                        json_data = json.loads(publish_result[0].text)
-                        logger.info("Publish offer result (JSON):")
-                        logger.info(json.dumps(json_data, indent=2))
+                    text = publish_result[0].text
+                    if _looks_like_json(text):
+                        json_data = _loads(text)
+                        logger.info("Publish offer result (JSON):\n%s", _LazyJson(json_data))
                         
                         if json_data.get('success') and 'data' in json_data and 'listingId' in json_data['data'].get('details', {}):
                             test_publish.set_passed(f"Successfully published offer as listing {json_data['data']['details']['listingId']}")
@@ -323,16 +345,15 @@ async def manage_offer_test():
                             error_msg = json_data.get('error', 'Unknown error')
                             test_publish.set_failed(f"Failed to publish offer: {error_msg}")
                             
-                    except json.JSONDecodeError:
+                    else:
                         # If not JSON, log the raw text
-                        logger.info("Publish offer result (raw text):")
-                        logger.info(publish_result[0].text)
+                        logger.info("Publish offer result (raw text):\n%s", text)
                         
                         # Check for common error patterns in the text
-                        if "error" in publish_result[0].text.lower():
-                            test_publish.set_failed(f"Publish failed with error: {publish_result[0].text}")
+                        if "error" in text.lower():
+                            test_publish.set_failed(f"Publish failed with error: {text}")
                         else:
-                            test_publish.set_failed(f"Unexpected response format: {publish_result[0].text}")
+                            test_publish.set_failed(f"Unexpected response format: {text}")
                         
                 except (IndexError, AttributeError) as e:
                     error_msg = f"Error processing publish result: {e}"
@@ -368,9 +389,8 @@ async def manage_offer_test():
                 )
                 
                 try:
-                    json_data = json.loads(withdraw_result[0].text)
-                    logger.info("Withdraw offer result:")
-                    logger.info(json.dumps(json_data, indent=2))
+                    json_data = _loads(withdraw_result[0].text)
+                    logger.info("Withdraw offer result:\n%s", _LazyJson(json_data))
                     if json_data.get('success') and 'data' in json_data and json_data['data'].get('offer_id') == offer_id:
                         test_withdraw.set_passed(f"Successfully withdrew offer {offer_id}")
                     else:
@@ -390,24 +410,37 @@ async def manage_offer_test():
                 test_results.append(test_withdraw)
                 logger.info(str(test_withdraw))
                 
-                # Print test summary
-                logger.info("\n" + "="*50)
-                logger.info("TEST SUMMARY")
-                logger.info("="*50)
-                
+                # Print test summary as a single log record
                 passed = sum(1 for r in test_results if r.passed)
                 total = len(test_results)
                 
-                for result in test_results:
-                    logger.info(str(result))
-                
-                logger.info("\n" + "-"*50)
-                logger.info(f"TOTAL: {passed} out of {total} tests passed ({passed/total*100:.1f}%)")
-                logger.info("="*50 + "\n")
+                logger.info("\n".join([
+                    "\n" + "="*50,
+                    "TEST SUMMARY",
+                    "="*50,
+                    *map(str, test_results),
+                    "\n" + "-"*50,
+                    f"TOTAL: {passed} out of {total} tests passed ({passed/total*100:.1f}%)",
+                    "="*50 + "\n",
+                ]))
     
     except Exception as e:
         logger.error(f"Error during test: {e}", exc_info=True)
         raise
 
+def main():
+    if uvloop is not None:
+        uvloop.run(manage_offer_test())
+    else:
+        asyncio.run(manage_offer_test())
+
 if __name__ == "__main__":
-    asyncio.run(manage_offer_test())
+    # Pass --profile to print the 40 most expensive calls (cumulative) after the run
+    if "--profile" in sys.argv[1:]:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.runcall(main)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(40)
+    else:
+        main()
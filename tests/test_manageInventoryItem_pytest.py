@@ -1,9 +1,12 @@
+import logging
+
 import pytest
-import pytest_asyncio
-import json
-from fastmcp import Client
+import orjson
+
+logger = logging.getLogger(__name__)
 
 # Test configuration
+INVENTORY_ITEM_TOOL = "inventoryAPI_manage_inventory_item"
 TEST_SKU = "TT-01"
 TEST_ITEM_DATA = {
     "product": {
@@ -23,62 +26,55 @@ TEST_ITEM_DATA = {
     "availability": {"shipToLocationAvailability": {"quantity": 1}},
 }
 
-# Fixtures
-@pytest_asyncio.fixture
-async def mcp_client():
-    """Fixture to provide MCP client connection"""
-    async with Client("src/main_server.py") as client:
-        yield client
+# Helpers
+async def _invoke(client, params):
+    """Calls the manage_inventory_item tool and returns its parsed JSON response ({} for an empty body)"""
+    result = await client.call_tool(INVENTORY_ITEM_TOOL, {"params": params})
+    text = result[0].text
+    try:
+        return orjson.loads(text) if text else {}
+    except orjson.JSONDecodeError:
+        raise AssertionError(f"Invalid JSON response: {text}") from None
 
 # Test 1: Clean up - Delete inventory item if it exists
-@pytest.mark.asyncio
 async def test_01_cleanup_inventory_item(mcp_client):
     """Test 1: Delete inventory item if it exists (cleanup)"""
     try:
-        result = await mcp_client.call_tool(
-            "inventoryAPI_manage_inventory_item",
-            {"params": {"sku": TEST_SKU, "action": "delete"}},
-        )
-        json_data = json.loads(result[0].text)
+        json_data = await _invoke(mcp_client, {"sku": TEST_SKU, "action": "delete"})
         if json_data.get("success"):
-            print(f"Deleted existing inventory item: {TEST_SKU}")
+            logger.info("Deleted existing inventory item: %s", TEST_SKU)
+    except pytest.exit.Exception:
+        raise # Call budget or rate limit: the session is being aborted
     except Exception as e:
-        print(f"No cleanup needed or cleanup failed: {str(e)}")
+        logger.info("No cleanup needed or cleanup failed: %s", e)
     
     # This test always passes as it's just for cleanup
     assert True
 
 # Test 2: Create inventory item
-@pytest.mark.asyncio
 async def test_02_create_inventory_item(mcp_client):
     """Test 2: Create a new inventory item"""
     # First, clean up any existing item
     try:
         await mcp_client.call_tool(
-            "inventoryAPI_manage_inventory_item",
+            INVENTORY_ITEM_TOOL,
             {"params": {"sku": TEST_SKU, "action": "delete"}},
         )
+    except pytest.exit.Exception:
+        raise # Call budget or rate limit: the session is being aborted
     except Exception as e:
-        print(f"Cleanup of existing item failed (may not exist): {str(e)}")
+        logger.info("Cleanup of existing item failed (may not exist): %s", e)
     
     # Now create the item
-    result = await mcp_client.call_tool(
-        "inventoryAPI_manage_inventory_item",
+    json_data = await _invoke(
+        mcp_client,
         {
-            "params": {
-                "sku": TEST_SKU,
-                "action": "create",
-                "item_data": TEST_ITEM_DATA,
-            }
+            "sku": TEST_SKU,
+            "action": "create",
+            "item_data": TEST_ITEM_DATA,
         },
     )
     
-    # Handle the response
-    try:
-        json_data = json.loads(result[0].text)
-    except json.JSONDecodeError:
-        assert False, f"Invalid JSON response: {result[0].text}"
-    
     # Check if creation was successful
     assert json_data.get("success"), f"Create inventory item failed: {json_data.get('error', 'Unknown error')}"
     assert "data" in json_data, f"Response missing 'data' field: {json_data}"
@@ -88,20 +84,14 @@ async def test_02_create_inventory_item(mcp_client):
     return json_data["data"]
 
 # Test 3: Get inventory item
-@pytest.mark.asyncio
 async def test_03_get_inventory_item(mcp_client):
     """Test 3: Get an existing inventory item"""
-    result = await mcp_client.call_tool(
-        "inventoryAPI_manage_inventory_item",
-        {"params": {"sku": TEST_SKU, "action": "get"}},
-    )
-    json_data = json.loads(result[0].text)
+    json_data = await _invoke(mcp_client, {"sku": TEST_SKU, "action": "get"})
     assert json_data.get("success"), f"Get inventory item failed: {json_data.get('error')}"
     assert json_data["data"]["sku"] == TEST_SKU
     return json_data["data"]
 
 # Test 4: Modify inventory item
-@pytest.mark.asyncio
 async def test_04_modify_inventory_item(mcp_client):
     """Test 4: Modify an existing inventory item"""
     modified_data = {
@@ -113,35 +103,22 @@ async def test_04_modify_inventory_item(mcp_client):
         "availability": {"shipToLocationAvailability": {"quantity": 3}},
     }
 
-    result = await mcp_client.call_tool(
-        "inventoryAPI_manage_inventory_item",
+    json_data = await _invoke(
+        mcp_client,
         {
-            "params": {
-                "sku": TEST_SKU,
-                "action": "modify",
-                "item_data": modified_data,
-            }
+            "sku": TEST_SKU,
+            "action": "modify",
+            "item_data": modified_data,
         },
     )
-    json_data = json.loads(result[0].text)
     assert json_data.get("success"), f"Modify inventory item failed: {json_data.get('error')}"
     return json_data["data"]
 
 # Test 5: Verify modified inventory item
-@pytest.mark.asyncio
 async def test_05_verify_modified_item(mcp_client):
     """Test 5: Verify the modified inventory item"""
     # First, get the modified item
-    result = await mcp_client.call_tool(
-        "inventoryAPI_manage_inventory_item",
-        {"params": {"sku": TEST_SKU, "action": "get"}},
-    )
-    
-    # Handle potential empty or invalid JSON response
-    try:
-        json_data = json.loads(result[0].text)
-    except json.JSONDecodeError:
-        assert False, f"Invalid JSON response: {result[0].text}"
+    json_data = await _invoke(mcp_client, {"sku": TEST_SKU, "action": "get"})
     
     # Check if the API call was successful
     assert json_data.get("success"), f"Get modified item failed: {json_data.get('error', 'Unknown error')}"
@@ -151,7 +128,8 @@ async def test_05_verify_modified_item(mcp_client):
     item_data = json_data["data"]
     
     # Print the full response for debugging
-    print(f"Full item data: {json.dumps(item_data, indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Full item data: %s", orjson.dumps(item_data, option=orjson.OPT_INDENT_2).decode())
     
     # Check top-level fields in the details object
     assert "details" in item_data, f"Item data missing 'details' field: {item_data}"
@@ -180,36 +158,22 @@ async def test_05_verify_modified_item(mcp_client):
     return item_data
 
 # Test 6: Delete inventory item
-@pytest.mark.asyncio
 async def test_06_delete_inventory_item(mcp_client):
     """Test 6: Delete the inventory item"""
     # First, delete the item
-    result = await mcp_client.call_tool(
-        "inventoryAPI_manage_inventory_item",
-        {"params": {"sku": TEST_SKU, "action": "delete"}},
-    )
-    
-    # Handle potential empty or invalid JSON response
-    try:
-        json_data = json.loads(result[0].text) if result[0].text else {}
-    except json.JSONDecodeError:
-        assert False, f"Invalid JSON response when deleting item: {result[0].text}"
+    json_data = await _invoke(mcp_client, {"sku": TEST_SKU, "action": "delete"})
     
     # Check if deletion was successful
     assert json_data.get("success"), f"Delete inventory item failed: {json_data.get('error', 'Unknown error')}"
     
     # Verify deletion by trying to get the deleted item
-    result = await mcp_client.call_tool(
-        "inventoryAPI_manage_inventory_item",
-        {"params": {"sku": TEST_SKU, "action": "get"}},
-    )
-    
-    # The get request for a non-existent item should not be successful
     try:
-        json_data = json.loads(result[0].text) if result[0].text else {}
-        assert not json_data.get("success"), \
-            f"Expected item to be deleted, but it still exists: {json_data}"
-    except json.JSONDecodeError:
+        json_data = await _invoke(mcp_client, {"sku": TEST_SKU, "action": "get"})
+    except AssertionError:
         # If we can't parse the response, it's likely because the item doesn't exist
         # which is the expected behavior after deletion
-        pass
+        json_data = {}
+    
+    # The get request for a non-existent item should not be successful
+    assert not json_data.get("success"), \
+        f"Expected item to be deleted, but it still exists: {json_data}"
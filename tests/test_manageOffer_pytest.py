@@ -1,10 +1,17 @@
+import asyncio
+import logging
+import os
+
 import pytest
-import pytest_asyncio
-import json
-from fastmcp import Client
+import orjson
+
+logger = logging.getLogger(__name__)
 
 # --- Test Configuration ---
-TEST_SKU = "TT-01"
+OFFER_TOOL = "inventoryAPI_manage_offer"
+INVENTORY_ITEM_TOOL = "inventoryAPI_manage_inventory_item"
+# Each pytest-xdist worker (gw0, gw1, ...) gets its own SKU; a plain run uses TT-01
+TEST_SKU = f"TT-{os.environ.get('PYTEST_XDIST_WORKER', '01')}"
 TEST_CATEGORY_ID = "39630" # Example Category ID, replace if needed
 
 # Data for creating the base inventory item if it doesn't exist
@@ -52,56 +59,74 @@ MODIFIED_OFFER_DATA = {
 }
 
 # --- Fixtures ---
-@pytest_asyncio.fixture
-async def mcp_client():
-    """Fixture to provide MCP client connection"""
-    async with Client("src/main_server.py") as client:
-        yield client
+@pytest.fixture(scope="module")
+def offer_state():
+    """Carries the offer ID found by test_02/test_03 forward, so later tests skip a precondition get"""
+    return {}
+
+# --- Helpers ---
+async def _call_json(mcp_client, tool, params):
+    """Calls an MCP tool and returns its response text parsed with orjson"""
+    result = await mcp_client.call_tool(tool, {"params": params})
+    return orjson.loads(result[0].text)
+
+def _check_ok(json_data, label):
+    """Fails the test with the tool's error message unless the response reports success"""
+    if not json_data.get('success'):
+        error = json_data.get('error_message') or json_data.get('error') or 'Unknown error'
+        if isinstance(error, dict):
+            error = error.get('message', 'Unknown error')
+        pytest.fail(f"{label}: MCP tool call failed - {error}")
 
 # --- Helper to get offer details ---
 async def _get_offer_details(mcp_client, sku):
     try:
-        result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-            "params": {"sku": sku, "action": "get"}
-        })
-        response_text = result[0].text
-        json_data = json.loads(response_text)
+        json_data = await _call_json(mcp_client, OFFER_TOOL, {"sku": sku, "action": "get"})
         if json_data.get('success') and json_data.get('data', {}).get('details'):
             return json_data['data']['details'] # This is the raw offer data from eBay
+    except pytest.exit.Exception:
+        raise # Call budget or rate limit: the session is being aborted
     except Exception as e:
-        print(f"Error getting offer details for {sku}: {e}\nResponse: {response_text if 'response_text' in locals() else 'N/A'}")
+        logger.warning("Error getting offer details for %s: %s", sku, e)
     return None
 
 # --- Test Functions ---
 
-@pytest.mark.asyncio
 async def test_01_cleanup_prepare_offer(mcp_client):
     """Ensures inventory item exists and no offer is currently published."""
+    # The inventory item and offer lookups are independent, so issue them together
+    inv_item_json, offer_details = await asyncio.gather(
+        _call_json(mcp_client, INVENTORY_ITEM_TOOL, {"sku": TEST_SKU, "action": "get"}),
+        _get_offer_details(mcp_client, TEST_SKU),
+        return_exceptions=True,
+    )
+    for result in (inv_item_json, offer_details):
+        if isinstance(result, pytest.exit.Exception):
+            raise result
+
     # 1a. Check Inventory Item Exists, create if not
     try:
-        inv_item_result = await mcp_client.call_tool("inventoryAPI_manage_inventory_item", {
-            "params": {"sku": TEST_SKU, "action": "get"}
-        })
-        inv_item_json = json.loads(inv_item_result[0].text)
+        if isinstance(inv_item_json, Exception):
+            raise inv_item_json
         if not (inv_item_json.get('success') and inv_item_json.get('data', {}).get('details')):
-            print(f"Inventory item {TEST_SKU} not found, creating...")
-            create_inv_result = await mcp_client.call_tool("inventoryAPI_manage_inventory_item", {
-                "params": {
-                    "sku": TEST_SKU,
-                    "action": "create",
-                    "item_data": TEST_INVENTORY_ITEM_DATA
-                }
+            logger.info("Inventory item %s not found, creating...", TEST_SKU)
+            create_inv_json = await _call_json(mcp_client, INVENTORY_ITEM_TOOL, {
+                "sku": TEST_SKU,
+                "action": "create",
+                "item_data": TEST_INVENTORY_ITEM_DATA
             })
-            create_inv_json = json.loads(create_inv_result[0].text)
             assert create_inv_json.get('success'), f"Failed to create inventory item {TEST_SKU}: {create_inv_json.get('error')}"
-            print(f"Inventory item {TEST_SKU} created.")
+            logger.info("Inventory item %s created.", TEST_SKU)
         else:
-            print(f"Inventory item {TEST_SKU} already exists.")
+            logger.info("Inventory item %s already exists.", TEST_SKU)
+    except pytest.exit.Exception:
+        raise
     except Exception as e:
         pytest.fail(f"Error during inventory item check/create for {TEST_SKU}: {e}")
 
     # 1b. Check if Offer is published, withdraw if so
-    offer_details = await _get_offer_details(mcp_client, TEST_SKU)
+    if isinstance(offer_details, Exception):
+        offer_details = None
     if offer_details:
         # eBay API typically returns offerState or listing.listingStatus for published status
         # For simplicity, we'll check for 'PUBLISHED' in a common field, or if a listingId exists
@@ -110,13 +135,10 @@ async def test_01_cleanup_prepare_offer(mcp_client):
                        (offer_details.get('listing') and offer_details['listing'].get('listingId'))
 
         if is_published:
-            print(f"Offer for {TEST_SKU} is published (Offer ID: {offer_details.get('offerId')}). Withdrawing...")
-            withdraw_result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-                "params": {"sku": TEST_SKU, "action": "withdraw"}
-            })
-            withdraw_json = json.loads(withdraw_result[0].text)
+            logger.info("Offer for %s is published (Offer ID: %s). Withdrawing...", TEST_SKU, offer_details.get('offerId'))
+            withdraw_json = await _call_json(mcp_client, OFFER_TOOL, {"sku": TEST_SKU, "action": "withdraw"})
             assert withdraw_json.get('success'), f"Failed to withdraw offer for {TEST_SKU}: {withdraw_json.get('error')}"
-            print(f"Offer for {TEST_SKU} withdrawn.")
+            logger.info("Offer for %s withdrawn.", TEST_SKU)
         else:
             # If an offer exists but isn't published, it might be in a 'CREATED' or 'UNPUBLISHED' state.
             # For a clean slate for test_02_create_offer, we should delete it.
@@ -124,72 +146,58 @@ async def test_01_cleanup_prepare_offer(mcp_client):
             # We'll proceed, and test_02_create_offer might fail if an unpublished offer already exists
             # and the API doesn't allow creating another one for the same SKU.
             # A more robust cleanup would involve deleting the inventory item and recreating it if an offer exists.
-            print(f"Offer for {TEST_SKU} exists but is not published (Offer ID: {offer_details.get('offerId')}, State: {offer_details.get('offerState')}). Test will proceed.")
+            logger.info("Offer for %s exists but is not published (Offer ID: %s, State: %s). Test will proceed.", TEST_SKU, offer_details.get('offerId'), offer_details.get('offerState'))
     else:
-        print(f"No existing offer found for {TEST_SKU}. Ready for creation.")
+        logger.info("No existing offer found for %s. Ready for creation.", TEST_SKU)
 
-@pytest.mark.asyncio
-async def test_02_create_offer(mcp_client):
+async def test_02_create_offer(mcp_client, offer_state):
     """Creates a new offer for the SKU. Success is based on the MCP tool returning success:true."""
-    print(f"Attempting to create offer for {TEST_SKU}...")
-    result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-        "params": {
-            "sku": TEST_SKU,
-            "action": "create",
-            "offer_data": INITIAL_OFFER_DATA
-        }
+    logger.info("Attempting to create offer for %s...", TEST_SKU)
+    json_data = await _call_json(mcp_client, OFFER_TOOL, {
+        "sku": TEST_SKU,
+        "action": "create",
+        "offer_data": INITIAL_OFFER_DATA
     })
-    json_data = json.loads(result[0].text)
-    assert json_data.get('success'), f"test_02_create_offer: MCP tool call failed - {json_data.get('error', {}).get('message', 'Unknown error')}"
+    _check_ok(json_data, "test_02_create_offer")
     offer_id = json_data.get('data', {}).get('offer_id', 'N/A')
-    print(f"test_02_create_offer: MCP tool call successful. Offer ID (if available): {offer_id}")
+    if offer_id != 'N/A':
+        offer_state["offer_id"] = offer_id
+    logger.info("test_02_create_offer: MCP tool call successful. Offer ID (if available): %s", offer_id)
 
-@pytest.mark.asyncio
-async def test_03_get_offer(mcp_client):
+async def test_03_get_offer(mcp_client, offer_state):
     """Gets an offer for the SKU. Success is based on the MCP tool returning success:true."""
-    print(f"Attempting to get offer for {TEST_SKU}...")
-    result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-        "params": {"sku": TEST_SKU, "action": "get"}
-    })
-    json_data = json.loads(result[0].text)
-    assert json_data.get('success'), f"test_03_get_offer: MCP tool call failed - {json_data.get('error', {}).get('message', 'Unknown error')}"
+    logger.info("Attempting to get offer for %s...", TEST_SKU)
+    json_data = await _call_json(mcp_client, OFFER_TOOL, {"sku": TEST_SKU, "action": "get"})
+    _check_ok(json_data, "test_03_get_offer")
     # Attempt to get offerId from common path, adjust if your 'get' response structure is different
     offer_id = json_data.get('data', {}).get('details', {}).get('offerId', 'N/A')
-    print(f"test_03_get_offer: MCP tool call successful. Offer ID (if available): {offer_id}")
+    if offer_id != 'N/A':
+        offer_state["offer_id"] = offer_id
+    logger.info("test_03_get_offer: MCP tool call successful. Offer ID (if available): %s", offer_id)
 
-@pytest.mark.asyncio
-async def test_04_modify_offer(mcp_client):
+async def test_04_modify_offer(mcp_client, offer_state):
     """Makes a modification to the offer. Success is based on the MCP tool returning success:true."""
-    print(f"Attempting to modify offer for {TEST_SKU}...")
-    # First, ensure the offer exists to make sure a modify operation is plausible
-    current_offer = await _get_offer_details(mcp_client, TEST_SKU)
-    assert current_offer, f"Cannot modify offer for {TEST_SKU}, it does not exist or could not be fetched. This is a precondition for the modify test."
-
-    result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-        "params": {
-            "sku": TEST_SKU, # manage_offer tool uses SKU to find the offer internally
-            "action": "modify",
-            "offer_data": MODIFIED_OFFER_DATA
-        }
+    logger.info("Attempting to modify offer for %s...", TEST_SKU)
+    # The offer must have been created or found by the earlier tests
+    assert offer_state.get("offer_id"), f"Cannot modify offer for {TEST_SKU}, it does not exist or could not be fetched. This is a precondition for the modify test."
+
+    json_data = await _call_json(mcp_client, OFFER_TOOL, {
+        "sku": TEST_SKU, # manage_offer tool uses SKU to find the offer internally
+        "action": "modify",
+        "offer_data": MODIFIED_OFFER_DATA
     })
-    json_data = json.loads(result[0].text)
-    assert json_data.get('success'), f"test_04_modify_offer: MCP tool call failed - {json_data.get('error', {}).get('message', 'Unknown error')}"
+    _check_ok(json_data, "test_04_modify_offer")
     modified_offer_id = json_data.get('data', {}).get('offer_id', 'N/A') # The modify response might return the offer_id
-    print(f"test_04_modify_offer: MCP tool call successful. Modified Offer ID (if available): {modified_offer_id}")
+    logger.info("test_04_modify_offer: MCP tool call successful. Modified Offer ID (if available): %s", modified_offer_id)
 
-@pytest.mark.asyncio
-async def test_05_publish_offer(mcp_client):
+async def test_05_publish_offer(mcp_client, offer_state):
     """Publishes the offer. Success is based on the MCP tool returning success:true and a listingId being present."""
-    print(f"Attempting to publish offer for {TEST_SKU}...")
-    # Ensure the offer exists before attempting to publish
-    current_offer = await _get_offer_details(mcp_client, TEST_SKU)
-    assert current_offer, f"Cannot publish offer for {TEST_SKU}, it does not exist or could not be fetched. This is a precondition for the publish test."
+    logger.info("Attempting to publish offer for %s...", TEST_SKU)
+    # The offer must have been created or found by the earlier tests
+    assert offer_state.get("offer_id"), f"Cannot publish offer for {TEST_SKU}, it does not exist or could not be fetched. This is a precondition for the publish test."
 
-    result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-        "params": {"sku": TEST_SKU, "action": "publish"} # manage_offer tool can use SKU to find offerId
-    })
-    json_data = json.loads(result[0].text)
-    assert json_data.get('success'), f"test_05_publish_offer: MCP tool call failed - {json_data.get('error', {}).get('message', 'Unknown error')}"
+    json_data = await _call_json(mcp_client, OFFER_TOOL, {"sku": TEST_SKU, "action": "publish"}) # manage_offer tool can use SKU to find offerId
+    _check_ok(json_data, "test_05_publish_offer")
     
     # Verify listingId is present in the response, indicating successful publishing with eBay
     # The listingId is available in data.details.listingId (camelCase from eBay API raw response)
@@ -197,19 +205,14 @@ async def test_05_publish_offer(mcp_client):
     assert retrieved_listing_id, \
         f"test_05_publish_offer: MCP tool call successful, but 'listingId' not found or is empty in response data.details: {json_data.get('data', {}).get('details')}"
     
-    print(f"test_05_publish_offer: MCP tool call successful. Listing ID: {retrieved_listing_id}")
+    logger.info("test_05_publish_offer: MCP tool call successful. Listing ID: %s", retrieved_listing_id)
 
-@pytest.mark.asyncio
-async def test_06_withdraw_offer(mcp_client):
+async def test_06_withdraw_offer(mcp_client, offer_state):
     """Withdraws the offer. Success is based on the MCP tool returning success:true."""
-    print(f"Attempting to withdraw offer for {TEST_SKU}...")
-    # Ensure the offer exists before attempting to withdraw
-    current_offer = await _get_offer_details(mcp_client, TEST_SKU)
-    assert current_offer, f"Cannot withdraw offer for {TEST_SKU}, it does not exist or could not be fetched. This is a precondition for the withdraw test."
+    logger.info("Attempting to withdraw offer for %s...", TEST_SKU)
+    # The offer must have been created or found by the earlier tests
+    assert offer_state.get("offer_id"), f"Cannot withdraw offer for {TEST_SKU}, it does not exist or could not be fetched. This is a precondition for the withdraw test."
 
-    result = await mcp_client.call_tool("inventoryAPI_manage_offer", {
-        "params": {"sku": TEST_SKU, "action": "withdraw"} # manage_offer tool can use SKU to find offerId
-    })
-    json_data = json.loads(result[0].text)
-    assert json_data.get('success'), f"test_06_withdraw_offer: MCP tool call failed - {json_data.get('error', {}).get('message', 'Unknown error')}"
-    print(f"test_06_withdraw_offer: MCP tool call successful. Offer for {TEST_SKU} withdrawal initiated.")
+    json_data = await _call_json(mcp_client, OFFER_TOOL, {"sku": TEST_SKU, "action": "withdraw"}) # manage_offer tool can use SKU to find offerId
+    _check_ok(json_data, "test_06_withdraw_offer")
+    logger.info("test_06_withdraw_offer: MCP tool call successful. Offer for %s withdrawal initiated.", TEST_SKU)
@@ -1,35 +1,58 @@
+import asyncio
+import re
+
+import orjson
 import pytest
 import pytest_asyncio
-import json
-from fastmcp import Client
 
-@pytest_asyncio.fixture
-async def mcp_client():
-    """Fixture to provide MCP client connection"""
-    async with Client("src/main_server.py") as client:
-        yield client
+# Case-insensitive patterns for the expected error texts (one regex pass instead of lowercasing the response)
+ERROR_RE = re.compile(r"error|validation|invalid", re.IGNORECASE)
+EMPTY_QUERY_ERROR_RE = re.compile(r"validation|invalid|empty|must have a valid 'q'|query parameter", re.IGNORECASE)
+INVALID_LIMIT_ERROR_RE = re.compile(r"validation|invalid|positive", re.IGNORECASE)
+
+# Arguments for each search case; the cases are independent, so they are sent to eBay together
+SEARCH_CASES = {
+    "basic": {"query": "trainers", "limit": 5},
+    "custom_limit": {"query": "trainers", "limit": 3},
+    "empty_query": {"query": "", "limit": 5},
+    "invalid_limit": {"query": "trainers", "limit": 0},
+}
+
+@pytest_asyncio.fixture(scope="module")
+async def search_responses(mcp_client):
+    """Runs every search case concurrently once; maps case name to response text (or the raised exception)"""
+    results = await asyncio.gather(
+        *(mcp_client.call_tool("browseAPI_search_ebay_items", args) for args in SEARCH_CASES.values()),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, pytest.exit.Exception):
+            raise result # Call budget or rate limit: abort now rather than in each test
+    return {
+        name: result if isinstance(result, Exception) else result[0].text
+        for name, result in zip(SEARCH_CASES, results)
+    }
+
+def _response_text(search_responses, case):
+    """Returns the response text for a search case, re-raising the error if the call itself failed"""
+    response = search_responses[case]
+    if isinstance(response, Exception):
+        raise response
+    return response
 
 def is_error_response(response_text):
     """Check if the response indicates an error"""
-    return any(term in response_text.lower() for term in ["error", "validation", "invalid"])
+    return ERROR_RE.search(response_text) is not None
 
-@pytest.mark.asyncio
-async def test_search_items_basic(mcp_client):
+def test_search_items_basic(search_responses):
     """Test basic search functionality with 'trainers' query"""
-    # Call the browseAPI_search_ebay_items tool
-    result = await mcp_client.call_tool("browseAPI_search_ebay_items", {
-        "query": "trainers",
-        "limit": 5
-    })
-    
-    # Parse the response
-    response_text = result[0].text
+    response_text = _response_text(search_responses, "basic")
     
     # Check if the response is an error
     assert not is_error_response(response_text), f"Expected successful response, got error: {response_text}"
     
     # Parse as JSON
-    json_data = json.loads(response_text)
+    json_data = orjson.loads(response_text)
     
     # Assert the response structure
     assert isinstance(json_data, dict), "Response should be a JSON object"
@@ -47,57 +70,29 @@ async def test_search_items_basic(mcp_client):
         assert "price" in item, "Item should have a 'price'"
         assert "itemWebUrl" in item, "Item should have a 'itemWebUrl'"
 
-@pytest.mark.asyncio
-async def test_search_items_custom_limit(mcp_client):
+def test_search_items_custom_limit(search_responses):
     """Test search with a custom limit"""
-    # Call the browseAPI_search_ebay_items tool with custom limit
-    result = await mcp_client.call_tool("browseAPI_search_ebay_items", {
-        "query": "trainers",
-        "limit": 3
-    })
-    
-    # Parse the response
-    response_text = result[0].text
+    response_text = _response_text(search_responses, "custom_limit")
     
     # Check if the response is an error
     assert not is_error_response(response_text), f"Expected successful response, got error: {response_text}"
     
     # Parse as JSON
-    json_data = json.loads(response_text)
+    json_data = orjson.loads(response_text)
     
     # Verify the number of results doesn't exceed the limit
     assert len(json_data.get("itemSummaries", [])) <= 3, "Should return no more than 3 items"
 
-@pytest.mark.asyncio
-async def test_search_items_empty_query(mcp_client):
-    """Test search with an empty query should return an error"""
-    result = await mcp_client.call_tool("browseAPI_search_ebay_items", {
-        "query": "",
-        "limit": 5
-    })
-    
-    # Check that the response indicates an error
-    response_text = result[0].text
-    assert is_error_response(response_text), f"Expected error response for empty query, got: {response_text}"
-    
-    # Check for either the Pydantic validation error or the eBay API error
-    assert any(term in response_text.lower() for term in [
-        "validation", "invalid", "empty", 
-        "must have a valid 'q'", "query parameter"
-    ]), f"Expected validation error or eBay API error for empty query, got: {response_text}"
-
-@pytest.mark.asyncio
-async def test_search_items_invalid_limit(mcp_client):
-    """Test search with invalid limit should return an error"""
-    result = await mcp_client.call_tool("browseAPI_search_ebay_items", {
-        "query": "trainers",
-        "limit": 0
-    })
-    
+@pytest.mark.parametrize("case, expected_error_re", [
+    ("empty_query", EMPTY_QUERY_ERROR_RE),      # Pydantic validation error or the eBay API error
+    ("invalid_limit", INVALID_LIMIT_ERROR_RE),  # validation error for a non-positive limit
+], ids=["empty_query", "invalid_limit"])
+def test_search_items_rejects_invalid_arguments(search_responses, case, expected_error_re):
+    """Test search with an empty query or invalid limit should return an error"""
     # Check that the response indicates an error
-    response_text = result[0].text
-    assert is_error_response(response_text), f"Expected error response for invalid limit, got: {response_text}"
+    response_text = _response_text(search_responses, case)
+    assert is_error_response(response_text), f"Expected error response for {case}, got: {response_text}"
     
-    # Check that the error message contains validation-related text
-    assert any(term in response_text.lower() for term in ["validation", "invalid", "positive"]), \
-        f"Expected validation error for invalid limit, got: {response_text}"
+    # Check that the error message contains the expected validation-related text
+    assert expected_error_re.search(response_text), \
+        f"Expected validation error or eBay API error for {case}, got: {response_text}"